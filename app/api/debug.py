@@ -1,13 +1,77 @@
+import hashlib
 from typing import Dict, Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 
 from app.config import settings
 from app.services.pubsub import PubSubService
 from app.api.deps import get_pubsub_service, get_authenticated_request
 
-router = APIRouter()
+# Settings are fixed for the process lifetime
+_DEBUG = settings.debug
+_USE_PUBSUB_MOCK = settings.use_pubsub_mock
+_PUBSUB_MOCK_AUTO_ENABLE = settings.pubsub_mock_auto_enable
+_TOPIC_MAP = settings.sensor_topic_mapping
+# Set for O(1) topic validation; list kept only for the error message
+_VALID_TOPICS = frozenset(_TOPIC_MAP.values())
+_VALID_TOPICS_LIST = list(_TOPIC_MAP.values())
+
+# /debug/config response depends only on settings, so it is encoded once
+_DEBUG_CONFIG_BYTES = orjson.dumps({
+    "debug_mode": _DEBUG,
+    "mock_configuration": {
+        "use_pubsub_mock": _USE_PUBSUB_MOCK,
+        "pubsub_mock_auto_enable": _PUBSUB_MOCK_AUTO_ENABLE,
+        "using_mock": _USE_PUBSUB_MOCK or (_PUBSUB_MOCK_AUTO_ENABLE and _DEBUG)
+    },
+    "service_info": {
+        "app_name": settings.app_name,
+        "app_version": settings.app_version,
+        "log_level": settings.log_level,
+        "metrics_enabled": settings.metrics_enabled
+    },
+    "pubsub_topics": _TOPIC_MAP,
+    "debug_endpoints": {
+        "messages": "/api/v1/debug/pubsub/messages",
+        "stats": "/api/v1/debug/pubsub/stats",
+        "clear": "/api/v1/debug/pubsub/messages (DELETE)",
+        "topic_messages": "/api/v1/debug/pubsub/topic/{topic_name}/messages"
+    }
+})
+_DEBUG_CONFIG_ETAG = f'"{hashlib.sha1(_DEBUG_CONFIG_BYTES).hexdigest()}"'
+
+
+async def _require_debug() -> None:
+    """Router dependency that hides debug endpoints outside debug mode"""
+    if not _DEBUG:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Debug endpoints are only available in debug mode"
+        )
+
+
+def _get_mock_data(
+    pubsub_service: PubSubService = Depends(get_pubsub_service),
+    api_key: Optional[str] = Depends(get_authenticated_request)
+) -> Dict[str, Any]:
+    """
+    Dependency providing mock Pub/Sub data to debug handlers.
+
+    Plain `def` so FastAPI runs it in the threadpool: get_mock_data() decodes
+    every stored message. Depends on authentication so it only runs for
+    authenticated requests.
+    """
+    mock_data = pubsub_service.get_mock_data()
+    if mock_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Mock Pub/Sub is not enabled. Set SENSORGATE_DEBUG=true or SENSORGATE_USE_PUBSUB_MOCK=true"
+        )
+    return mock_data
+
+
+router = APIRouter(dependencies=[Depends(_require_debug)])
 
 
 @router.get(
@@ -17,7 +81,7 @@ router = APIRouter()
 )
 async def get_mock_pubsub_messages(
     topic_name: Optional[str] = None,
-    pubsub_service: PubSubService = Depends(get_pubsub_service),
+    mock_data: Dict[str, Any] = Depends(_get_mock_data),
     api_key: Optional[str] = Depends(get_authenticated_request)
 ) -> Dict[str, Any]:
     """
@@ -32,20 +96,6 @@ async def get_mock_pubsub_messages(
     - All published messages grouped by topic
     - Message metadata including timestamps and IDs
     """
-    if not settings.debug:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Debug endpoints are only available in debug mode"
-        )
-
-    mock_data = pubsub_service.get_mock_data()
-    if mock_data is None:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Mock Pub/Sub is not enabled. Set SENSORGATE_DEBUG=true or SENSORGATE_USE_PUBSUB_MOCK=true"
-        )
-
-
     messages = mock_data.get("published_messages", {})
     stats = mock_data.get("stats", {})
 
@@ -66,7 +116,7 @@ async def get_mock_pubsub_messages(
     tags=["Debug"]
 )
 async def get_mock_pubsub_stats(
-    pubsub_service: PubSubService = Depends(get_pubsub_service),
+    mock_data: Dict[str, Any] = Depends(_get_mock_data),
     api_key: Optional[str] = Depends(get_authenticated_request)
 ) -> Dict[str, Any]:
     """
@@ -80,27 +130,13 @@ async def get_mock_pubsub_stats(
     - Topic statistics
     - Mock configuration info
     """
-    if not settings.debug:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Debug endpoints are only available in debug mode"
-        )
-
-    mock_data = pubsub_service.get_mock_data()
-    if mock_data is None:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Mock Pub/Sub is not enabled"
-        )
-
-
     return {
         "stats": mock_data.get("stats", {}),
         "configuration": {
-            "debug_mode": settings.debug,
-            "use_pubsub_mock": settings.use_pubsub_mock,
-            "pubsub_mock_auto_enable": settings.pubsub_mock_auto_enable,
-            "topic_mapping": settings.sensor_topic_mapping
+            "debug_mode": _DEBUG,
+            "use_pubsub_mock": _USE_PUBSUB_MOCK,
+            "pubsub_mock_auto_enable": _PUBSUB_MOCK_AUTO_ENABLE,
+            "topic_mapping": _TOPIC_MAP
         },
         "using_mock": True
     }
@@ -111,7 +147,7 @@ async def get_mock_pubsub_stats(
     summary="Clear Mock Pub/Sub Messages",
     tags=["Debug"]
 )
-async def clear_mock_pubsub_messages(
+def clear_mock_pubsub_messages(
     topic_name: Optional[str] = None,
     pubsub_service: PubSubService = Depends(get_pubsub_service),
     api_key: Optional[str] = Depends(get_authenticated_request)
@@ -128,12 +164,6 @@ async def clear_mock_pubsub_messages(
     - Confirmation of cleared messages
     - Updated statistics
     """
-    if not settings.debug:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Debug endpoints are only available in debug mode"
-        )
-
     success = pubsub_service.clear_mock_data(topic_name)
     if not success:
         raise HTTPException(
@@ -162,7 +192,7 @@ async def clear_mock_pubsub_messages(
 )
 async def get_topic_messages(
     topic_name: str,
-    pubsub_service: PubSubService = Depends(get_pubsub_service),
+    mock_data: Dict[str, Any] = Depends(_get_mock_data),
     api_key: Optional[str] = Depends(get_authenticated_request)
 ) -> Dict[str, Any]:
     """
@@ -177,29 +207,16 @@ async def get_topic_messages(
     - All messages for the specified topic
     - Message count and topic statistics
     """
-    if not settings.debug:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Debug endpoints are only available in debug mode"
-        )
-
-    mock_data = pubsub_service.get_mock_data()
-    if mock_data is None:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Mock Pub/Sub is not enabled"
-        )
-
     messages = mock_data.get("published_messages", {})
     topic_messages = messages.get(topic_name, [])
+    valid_topic = topic_name in _VALID_TOPICS
 
     if not topic_messages and topic_name not in messages:
         # Check if topic name is valid
-        valid_topics = list(settings.sensor_topic_mapping.values())
-        if topic_name not in valid_topics:
+        if not valid_topic:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Topic '{topic_name}' not found. Valid topics: {valid_topics}"
+                detail=f"Topic '{topic_name}' not found. Valid topics: {_VALID_TOPICS_LIST}"
             )
 
 
@@ -207,7 +224,7 @@ async def get_topic_messages(
         "topic_name": topic_name,
         "messages": topic_messages,
         "message_count": len(topic_messages),
-        "valid_topic": topic_name in settings.sensor_topic_mapping.values(),
+        "valid_topic": valid_topic,
         "using_mock": True
     }
 
@@ -218,8 +235,9 @@ async def get_topic_messages(
     tags=["Debug"]
 )
 async def get_debug_config(
+    request: Request,
     api_key: Optional[str] = Depends(get_authenticated_request)
-) -> Dict[str, Any]:
+) -> Response:
     """
     Get current debug and mock configuration.
 
@@ -229,34 +247,11 @@ async def get_debug_config(
     - Current debug settings
     - Mock configuration
     - Service status
-    """
-    if not settings.debug:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Debug endpoints are only available in debug mode"
-        )
 
-    # Determine if mock is active
-    using_mock = settings.use_pubsub_mock or (settings.pubsub_mock_auto_enable and settings.debug)
+    Supports `ETag`/`If-None-Match`; the configuration is fixed for the process lifetime.
+    """
+    headers = {"ETag": _DEBUG_CONFIG_ETAG}
+    if request.headers.get("if-none-match") == _DEBUG_CONFIG_ETAG:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    return {
-        "debug_mode": settings.debug,
-        "mock_configuration": {
-            "use_pubsub_mock": settings.use_pubsub_mock,
-            "pubsub_mock_auto_enable": settings.pubsub_mock_auto_enable,
-            "using_mock": using_mock
-        },
-        "service_info": {
-            "app_name": settings.app_name,
-            "app_version": settings.app_version,
-            "log_level": settings.log_level,
-            "metrics_enabled": settings.metrics_enabled
-        },
-        "pubsub_topics": settings.sensor_topic_mapping,
-        "debug_endpoints": {
-            "messages": "/api/v1/debug/pubsub/messages",
-            "stats": "/api/v1/debug/pubsub/stats",
-            "clear": "/api/v1/debug/pubsub/messages (DELETE)",
-            "topic_messages": "/api/v1/debug/pubsub/topic/{topic_name}/messages"
-        }
-    }
+    return Response(content=_DEBUG_CONFIG_BYTES, media_type="application/json", headers=headers)
@@ -1,15 +1,41 @@
-from fastapi import Depends
+from fastapi import Security
 from typing import Optional
 
-from app.services.auth import get_api_key
+from app.services.auth import auth_service, api_key_header
 from app.services.pubsub import pubsub_service, PubSubService
+from app.services.influxdb import influxdb_service, InfluxDBService
+from app.services.batcher import publish_batcher, PublishBatcher
 
 
 async def get_pubsub_service() -> PubSubService:
     """FastAPI dependency to get PubSub service instance"""
-    return pubsub_service
+    return pubsub_service()
 
 
-async def get_authenticated_request(api_key: Optional[str] = Depends(get_api_key)) -> Optional[str]:
-    """FastAPI dependency for authenticated requests"""
-    return api_key
+async def get_influxdb_service() -> InfluxDBService:
+    """FastAPI dependency to get InfluxDB service instance"""
+    return influxdb_service()
+
+
+async def get_publish_batcher() -> PublishBatcher:
+    """FastAPI dependency to get Pub/Sub publish batcher instance"""
+    return publish_batcher()
+
+
+if auth_service.allow_all:
+    # Public access or no API keys configured: decided once at import, so no
+    # header extraction or key check runs per request
+    async def get_authenticated_request() -> Optional[str]:
+        """FastAPI dependency for authenticated requests (all requests allowed)"""
+        return None
+
+else:
+    async def get_authenticated_request(api_key: Optional[str] = Security(api_key_header)) -> Optional[str]:
+        """
+        FastAPI dependency for authenticated requests.
+
+        Validates the `X-API-Key` header directly; FastAPI caches the result, so it
+        runs once per request however many dependencies declare it.
+        """
+        auth_service.authenticate_request(api_key)
+        return api_key
@@ -1,21 +1,69 @@
-from datetime import datetime
-from typing import Dict, Any
+import asyncio
+import time
+from typing import Dict, Any, Optional, Tuple
 
 from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import PlainTextResponse
 
 from app.config import settings
+from app.utils import utc_now_iso
 from app.services.pubsub import PubSubService
 from app.services.influxdb import InfluxDBService
-from app.api.deps import get_pubsub_service
+from app.api.deps import get_pubsub_service, get_influxdb_service
 
 router = APIRouter()
 
+# Configuration block is constant for the process lifetime
+_CONFIG_INFO = {
+    "supported_sensor_types": list(settings.sensor_topic_mapping.keys()),
+    "debug_mode": settings.debug,
+    "public_access_enabled": settings.public_access_enabled,
+    "features": {
+        "data_ingestion": True,
+        "historical_queries": True,
+        "device_management": True,
+    }
+}
+
+
+# Liveness probe body (probes only check the status code)
+_LIVE_BODY = b"alive"
+
+
+# Recent dependency health results shared by probes: (expires_at, result)
+_health_cache: Tuple[float, Optional[Tuple[Dict[str, Any], Dict[str, Any]]]] = (0.0, None)
+_health_lock = asyncio.Lock()
+
+
+async def _check_dependencies(
+    pubsub_service: PubSubService,
+    influxdb_service: InfluxDBService
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Run blocking Pub/Sub and InfluxDB health checks concurrently.
+
+    Results are reused for `health_cache_ttl` seconds, and concurrent probes
+    on a cache miss wait for a single check instead of each running their own.
+    """
+    global _health_cache
+
+    expires_at, result = _health_cache
+    if result is not None and time.monotonic() < expires_at:
+        return result
+
+    async with _health_lock:
+        expires_at, result = _health_cache
+        if result is not None and time.monotonic() < expires_at:
+            return result
 
-async def get_influxdb_service() -> InfluxDBService:
-    """FastAPI dependency to get InfluxDB service instance"""
-    from app.services.influxdb import influxdb_service
-    return influxdb_service
+        result = tuple(await asyncio.gather(
+            run_in_threadpool(pubsub_service.health_check),
+            run_in_threadpool(influxdb_service.health_check)
+        ))
+        _health_cache = (time.monotonic() + settings.health_cache_ttl, result)
+
+    return result
 
 
 @router.get("/health", summary="Health Check", tags=["Health"])
@@ -33,11 +81,8 @@ async def health_check(
         - Configuration info
         - System metrics
     """
-    # Check PubSub health
-    pubsub_health = pubsub_service.health_check()
-
-    # Check InfluxDB health
-    influxdb_health = influxdb_service.health_check()
+    # Check PubSub and InfluxDB health
+    pubsub_health, influxdb_health = await _check_dependencies(pubsub_service, influxdb_service)
 
     # Determine overall health
     overall_status = "healthy"
@@ -48,36 +93,24 @@ async def health_check(
         "service": "SensorGate",
         "version": settings.app_version,
         "status": overall_status,
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": utc_now_iso(),
         "checks": {
             "pubsub": pubsub_health,
             "influxdb": influxdb_health
         },
-        "config": {
-            "supported_sensor_types": list(settings.sensor_topic_mapping.keys()),
-            "debug_mode": settings.debug,
-            "public_access_enabled": settings.public_access_enabled,
-            "features": {
-                "data_ingestion": True,
-                "historical_queries": True,
-                "device_management": True,
-            }
-        }
+        "config": _CONFIG_INFO
     }
 
 
-@router.get("/health/live", summary="Liveness Probe", tags=["Health"])
-async def liveness_probe() -> Dict[str, str]:
+@router.get("/health/live", summary="Liveness Probe", tags=["Health"], response_class=PlainTextResponse)
+async def liveness_probe() -> PlainTextResponse:
     """
     Simple liveness probe for Kubernetes or container orchestrators.
 
-    Returns basic service status without dependency checks.
+    Returns constant `alive` body without dependency checks;
+    current UTC time is sent in the `X-Timestamp` header.
     """
-    return {
-        "status": "alive",
-        "service": "SensorGate",
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    return PlainTextResponse(content=_LIVE_BODY, headers={"X-Timestamp": utc_now_iso()})
 
 
 @router.get("/health/ready", summary="Readiness Probe", tags=["Health"])
@@ -90,8 +123,7 @@ async def readiness_probe(
 
     Includes dependency checks (Pub/Sub and InfluxDB connectivity).
     """
-    pubsub_health = pubsub_service.health_check()
-    influxdb_health = influxdb_service.health_check()
+    pubsub_health, influxdb_health = await _check_dependencies(pubsub_service, influxdb_service)
 
     is_ready = (pubsub_health["status"] == "healthy" and
                 influxdb_health["status"] == "healthy")
@@ -99,7 +131,7 @@ async def readiness_probe(
     return {
         "status": "ready" if is_ready else "not_ready",
         "service": "SensorGate",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": utc_now_iso(),
         "dependencies": {
             "pubsub": pubsub_health["status"],
             "influxdb": influxdb_health["status"]
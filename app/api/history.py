@@ -1,24 +1,206 @@
+import asyncio
+import base64
+import hashlib
+import logging
+import re
 import time
 from datetime import datetime, UTC
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Tuple, Callable, Awaitable
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter
 
 from app.models.history import (
-    HistoryQueryParams, HistoricalDataResponse, AggregatedDataResponse,
+    HistoryQueryParams, HistoricalDataPoint, HistoricalDataResponse, AggregatedDataPoint, AggregatedDataResponse,
     DeviceListResponse, SensorTypeStatsResponse, AggregationType
 )
 from app.models.sensor import SensorType
+from app.config import settings
 from app.services.influxdb import InfluxDBService
-from app.api.deps import get_authenticated_request
+from app.services.cache import response_cache
+from app.api.deps import get_authenticated_request, get_influxdb_service
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+logger = logging.getLogger(__name__)
 
+# Historical responses are encoded in chunks of this many points;
+# results larger than one chunk are streamed instead of cached
+_STREAM_CHUNK_SIZE = 1000
+_DATA_POINTS_ADAPTER = TypeAdapter(List[HistoricalDataPoint])
+_AGGREGATED_POINTS_ADAPTER = TypeAdapter(List[AggregatedDataPoint])
 
-async def get_influxdb_service() -> InfluxDBService:
-    """FastAPI dependency to get InfluxDB service instance"""
-    from app.services.influxdb import influxdb_service
-    return influxdb_service
+# Queries currently running, keyed by cache key, shared by identical requests
+_inflight: Dict[str, asyncio.Task] = {}
+
+# Page size bounds for cursor pagination of historical data
+_DEFAULT_PAGE_SIZE = 500
+_MAX_PAGE_SIZE = 5000
+# Raw InfluxDB _time in a cursor, kept as text so nanoseconds survive the round trip
+_RFC3339_UTC = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{1,9})?Z")
+
+
+def _cached_json_response(request: Request, body: bytes, max_age: int = settings.history_cache_ttl) -> Response:
+    """
+    Build JSON response with cache headers, answering 304 if client ETag matches.
+
+    Responses require an API key, so only the client may cache them, never a shared proxy.
+    """
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    headers = {
+        "Cache-Control": f"private, max-age={max_age}",
+        "Vary": "X-API-Key",
+        "ETag": etag
+    }
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _run_once(key: str, query: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run `query` once for all concurrent callers with the same key.
+
+    The query runs as a task awaited through `asyncio.shield`, so a disconnecting
+    client does not cancel it for the other waiters.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(query())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+
+    return await asyncio.shield(task)
+
+
+def _build_query_params(**params: Any) -> HistoryQueryParams:
+    """
+    Build history query parameters from values already validated by FastAPI.
+
+    Per-field constraints are enforced by the endpoint `Query`/`Path` declarations,
+    so only the cross-field range checks are run here.
+    """
+    query_params = HistoryQueryParams.model_construct(**params)
+
+    error = query_params.range_error()
+    if error:
+        logger.warning("History query validation failed: %s", error)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Query validation failed: {error}"
+        )
+
+    return query_params
+
+
+def _params_echo(query_params: HistoryQueryParams) -> Dict[str, Any]:
+    """Query parameters echoed in responses and used as cache key (no model_dump pass)"""
+    return {
+        "start_time": query_params.start_time,
+        "end_time": query_params.end_time,
+        "sensor_type": query_params.sensor_type,
+        "device_id": query_params.device_id,
+        "latitude_min": query_params.latitude_min,
+        "latitude_max": query_params.latitude_max,
+        "longitude_min": query_params.longitude_min,
+        "longitude_max": query_params.longitude_max,
+        "aggregation": query_params.aggregation
+    }
+
+
+def _encode_cursor(key: Tuple[str, str, str]) -> str:
+    """Encode raw (_time, device_id, sensor_type) key of the last returned point as opaque cursor"""
+    return base64.urlsafe_b64encode(orjson.dumps(key)).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, str, str]:
+    """Decode cursor into raw (_time, device_id, sensor_type) position"""
+    try:
+        timestamp, device_id, sensor_type = orjson.loads(base64.urlsafe_b64decode(cursor))
+        # Every part is interpolated into the Flux query, so each must be well-formed
+        if not _RFC3339_UTC.fullmatch(timestamp):
+            raise ValueError(f"invalid cursor time {timestamp!r}")
+        return timestamp, str(int(device_id)), SensorType(sensor_type).value
+    except (ValueError, TypeError):
+        logger.warning("History query validation failed: invalid cursor %r", cursor)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Query validation failed: invalid cursor"
+        )
+
+
+def _iter_history_body(
+    data_points: List[HistoricalDataPoint],
+    params_echo: Dict[str, Any],
+    execution_time: float,
+    next_cursor: Optional[str]
+) -> Iterator[bytes]:
+    """Encode HistoricalDataResponse JSON in bounded-size chunks"""
+    yield b'{"data":['
+    for offset in range(0, len(data_points), _STREAM_CHUNK_SIZE):
+        chunk = _DATA_POINTS_ADAPTER.dump_json(data_points[offset:offset + _STREAM_CHUNK_SIZE])
+        yield (b',' if offset else b'') + chunk[1:-1]
+
+    tail = orjson.dumps({
+        "total_count": len(data_points),
+        "query_params": params_echo,
+        "execution_time_ms": execution_time,
+        "next_cursor": next_cursor
+    }, option=orjson.OPT_UTC_Z)
+    yield b'],' + tail[1:]
+
+
+async def _run_history_query(
+    request: Request,
+    query_params: HistoryQueryParams,
+    influxdb_service: InfluxDBService,
+    limit: int,
+    cursor: Optional[str]
+) -> Response:
+    """Run paginated historical data query shared by all history endpoints (cached or streamed)"""
+    after = _decode_cursor(cursor) if cursor else None
+
+    params_echo = _params_echo(query_params)
+    params_echo["limit"] = limit
+    params_echo["cursor"] = cursor
+    cache_key = response_cache.build_key("history", params_echo)
+    cached_body = await response_cache.get(cache_key)
+    if cached_body is not None:
+        return _cached_json_response(request, cached_body)
+
+    async def query() -> Tuple[List[HistoricalDataPoint], Optional[Tuple[str, str, str]], float]:
+        start_query_time = time.time()
+        data_points, next_key = await influxdb_service.query_historical_page(
+            query_params, limit, after
+        )
+        return data_points, next_key, (time.time() - start_query_time) * 1000
+
+    try:
+        # Identical concurrent requests share a single InfluxDB query
+        data_points, next_key, execution_time = await _run_once(cache_key, query)
+
+    except Exception:
+        logger.exception("get_historical_data failed")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve historical data"
+        )
+
+    next_cursor = _encode_cursor(next_key) if next_key else None
+
+    body_chunks = _iter_history_body(data_points, params_echo, execution_time, next_cursor)
+
+    if len(data_points) > _STREAM_CHUNK_SIZE:
+        # Large results are encoded chunk by chunk while being sent
+        return StreamingResponse(body_chunks, media_type="application/json")
+
+    body = b"".join(body_chunks)
+    await response_cache.set(cache_key, body, expire=settings.history_cache_ttl)
+
+    return _cached_json_response(request, body)
 
 
 @router.get(
@@ -28,6 +210,7 @@ async def get_influxdb_service() -> InfluxDBService:
     tags=["History"]
 )
 async def get_historical_data(
+    request: Request,
     start_time: datetime = Query(..., description="Start time (ISO 8601 format)"),
     end_time: datetime = Query(..., description="End time (ISO 8601 format)"),
     sensor_type: Optional[SensorType] = Query(None, description="Filter by sensor type"),
@@ -36,6 +219,8 @@ async def get_historical_data(
     latitude_max: Optional[float] = Query(None, description="Maximum latitude", ge=-90, le=90),
     longitude_min: Optional[float] = Query(None, description="Minimum longitude", ge=-180, le=180),
     longitude_max: Optional[float] = Query(None, description="Maximum longitude", ge=-180, le=180),
+    limit: int = Query(_DEFAULT_PAGE_SIZE, description="Maximum number of data points per page", gt=0, le=_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Pagination cursor from previous page `next_cursor`"),
     influxdb_service: InfluxDBService = Depends(get_influxdb_service),
     api_key: Optional[str] = Depends(get_authenticated_request)
 ) -> HistoricalDataResponse:
@@ -49,64 +234,34 @@ async def get_historical_data(
     - `device_id`: Optional filter by specific device ID
     - `latitude_min/max`: Optional location-based filtering by latitude range
     - `longitude_min/max`: Optional location-based filtering by longitude range
+    - `limit`: Page size (default 500, max 5000)
+    - `cursor`: Opaque cursor returned as `next_cursor` by the previous page
 
     **Response:**
-    - List of historical data points matching the criteria
+    - Page of historical data points matching the criteria, ordered by time and device
     - Total count and execution time information
+    - `next_cursor` to fetch the next page (null on the last page)
 
     **Examples:**
     - Get all temperature data for last hour:
       `?start_time=2024-01-15T12:00:00Z&end_time=2024-01-15T13:00:00Z&sensor_type=temperature`
     - Get data from specific device:
       `?start_time=2024-01-15T12:00:00Z&end_time=2024-01-15T13:00:00Z&device_id=12345`
-    """
-    start_query_time = time.time()
-
-    try:
-        # Create query parameters
-        query_params = HistoryQueryParams(
-            start_time=start_time,
-            end_time=end_time,
-            sensor_type=sensor_type,
-            device_id=device_id,
-            latitude_min=latitude_min,
-            latitude_max=latitude_max,
-            longitude_min=longitude_min,
-            longitude_max=longitude_max
-        )
-
-
-        # Query historical data
-        data_points = await influxdb_service.query_historical_data(query_params)
-
-        execution_time = (time.time() - start_query_time) * 1000
-
-        response = HistoricalDataResponse(
-            data=data_points,
-            total_count=len(data_points),
-            query_params=query_params.model_dump(),
-            execution_time_ms=execution_time
-        )
-
-        return response
-
-    except ValueError as validation_error:
-
-        print('Validation error:', validation_error)
-
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail=f"Query validation failed: {validation_error}"
-        )
-
-    except Exception as e:
 
-        print('get_historical_data Unexpected error:', e)
+    Responses are cached for a short period and support `ETag`/`If-None-Match`.
+    """
+    query_params = _build_query_params(
+        start_time=start_time,
+        end_time=end_time,
+        sensor_type=sensor_type,
+        device_id=device_id,
+        latitude_min=latitude_min,
+        latitude_max=latitude_max,
+        longitude_min=longitude_min,
+        longitude_max=longitude_max
+    )
 
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to retrieve historical data"
-        )
+    return await _run_history_query(request, query_params, influxdb_service, limit, cursor)
 
 
 @router.get(
@@ -116,6 +271,7 @@ async def get_historical_data(
     tags=["History"]
 )
 async def get_aggregated_data(
+    request: Request,
     start_time: datetime = Query(..., description="Start time (ISO 8601 format)"),
     end_time: datetime = Query(..., description="End time (ISO 8601 format)"),
     aggregation: AggregationType = Query(AggregationType.MEAN, description="Aggregation type"),
@@ -127,7 +283,7 @@ async def get_aggregated_data(
     longitude_max: Optional[float] = Query(None, description="Maximum longitude", ge=-180, le=180),
     influxdb_service: InfluxDBService = Depends(get_influxdb_service),
     api_key: Optional[str] = Depends(get_authenticated_request)
-) -> AggregatedDataResponse:
+) -> Response:
     """
     Retrieve aggregated historical sensor data.
 
@@ -147,63 +303,53 @@ async def get_aggregated_data(
     - Aggregated data points with statistics
     - Original data point count and execution time
     """
-    start_query_time = time.time()
-
-    try:
-        # Create query parameters
-        query_params = HistoryQueryParams(
-            start_time=start_time,
-            end_time=end_time,
-            sensor_type=sensor_type,
-            device_id=device_id,
-            latitude_min=latitude_min,
-            latitude_max=latitude_max,
-            longitude_min=longitude_min,
-            longitude_max=longitude_max,
-            aggregation=aggregation
-        )
+    query_params = _build_query_params(
+        start_time=start_time,
+        end_time=end_time,
+        sensor_type=sensor_type,
+        device_id=device_id,
+        latitude_min=latitude_min,
+        latitude_max=latitude_max,
+        longitude_min=longitude_min,
+        longitude_max=longitude_max,
+        aggregation=aggregation
+    )
 
+    params_echo = _params_echo(query_params)
+    cache_key = response_cache.build_key("history-aggregated", params_echo)
+    cached_body = await response_cache.get(cache_key)
+    if cached_body is not None:
+        return _cached_json_response(request, cached_body)
 
-        # Query aggregated data
+    async def query() -> Tuple[List[AggregatedDataPoint], float]:
+        start_query_time = time.time()
         aggregated_points = await influxdb_service.query_aggregated_data(query_params)
+        return aggregated_points, (time.time() - start_query_time) * 1000
 
-        # Calculate total original data points
-        total_original_count = sum(point.count for point in aggregated_points)
-
-        execution_time = (time.time() - start_query_time) * 1000
-
-
-        response = AggregatedDataResponse(
-            data=aggregated_points,
-            total_count=total_original_count,
-            query_params=query_params.model_dump(),
-            execution_time_ms=execution_time
-        )
-
-
-        return response
-
-    except ValueError as validation_error:
-
-
-        print('get_aggregated_data Validation error:', validation_error)
-
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail=f"Query validation failed: {validation_error}"
-        )
-
-    except Exception as e:
-
-
-
-        print('get_aggregated_data Unexpected error:', e)
+    try:
+        # Query aggregated data (shared by identical concurrent requests)
+        aggregated_points, execution_time = await _run_once(cache_key, query)
 
+    except Exception:
+        logger.exception("get_aggregated_data failed")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to retrieve aggregated data"
         )
 
+    # Encoded directly (same shape as AggregatedDataResponse) without building
+    # the response model and validating the point list again
+    tail = orjson.dumps({
+        # Total original data points
+        "total_count": sum(point.count for point in aggregated_points),
+        "query_params": params_echo,
+        "execution_time_ms": execution_time
+    }, option=orjson.OPT_UTC_Z)
+    body = b'{"data":' + _AGGREGATED_POINTS_ADAPTER.dump_json(aggregated_points) + b',' + tail[1:]
+    await response_cache.set(cache_key, body, expire=settings.history_cache_ttl)
+
+    return _cached_json_response(request, body)
+
 
 @router.get(
     "/sensors/history/by-sensor-type/{sensor_type}",
@@ -212,6 +358,7 @@ async def get_aggregated_data(
     tags=["History"]
 )
 async def get_data_by_sensor_type(
+    request: Request,
     sensor_type: SensorType,
     start_time: datetime = Query(..., description="Start time (ISO 8601 format)"),
     end_time: datetime = Query(..., description="End time (ISO 8601 format)"),
@@ -219,6 +366,8 @@ async def get_data_by_sensor_type(
     latitude_max: Optional[float] = Query(None, description="Maximum latitude", ge=-90, le=90),
     longitude_min: Optional[float] = Query(None, description="Minimum longitude", ge=-180, le=180),
     longitude_max: Optional[float] = Query(None, description="Maximum longitude", ge=-180, le=180),
+    limit: int = Query(_DEFAULT_PAGE_SIZE, description="Maximum number of data points per page", gt=0, le=_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Pagination cursor from previous page `next_cursor`"),
     influxdb_service: InfluxDBService = Depends(get_influxdb_service),
     api_key: Optional[str] = Depends(get_authenticated_request)
 ) -> HistoricalDataResponse:
@@ -232,24 +381,24 @@ async def get_data_by_sensor_type(
     - `start_time`: Start time for data query
     - `end_time`: End time for data query
     - Location filters (optional)
+    - `limit`/`cursor`: Pagination, as for `/sensors/history`
 
     **Response:**
     - All historical data points for the specified sensor type
     - Includes data from all devices with that sensor type
     """
-    return await get_historical_data(
+    query_params = _build_query_params(
         start_time=start_time,
         end_time=end_time,
         sensor_type=sensor_type,
-        device_id=None,
         latitude_min=latitude_min,
         latitude_max=latitude_max,
         longitude_min=longitude_min,
-        longitude_max=longitude_max,
-        influxdb_service=influxdb_service,
-        api_key=api_key
+        longitude_max=longitude_max
     )
 
+    return await _run_history_query(request, query_params, influxdb_service, limit, cursor)
+
 
 @router.get(
     "/sensors/history/by-device/{device_id}",
@@ -258,10 +407,13 @@ async def get_data_by_sensor_type(
     tags=["History"]
 )
 async def get_data_by_device(
-    device_id: int,
+    request: Request,
+    device_id: int = Path(..., description="Device ID", gt=0),
     start_time: datetime = Query(..., description="Start time (ISO 8601 format)"),
     end_time: datetime = Query(..., description="End time (ISO 8601 format)"),
     sensor_type: Optional[SensorType] = Query(None, description="Filter by sensor type"),
+    limit: int = Query(_DEFAULT_PAGE_SIZE, description="Maximum number of data points per page", gt=0, le=_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Pagination cursor from previous page `next_cursor`"),
     influxdb_service: InfluxDBService = Depends(get_influxdb_service),
     api_key: Optional[str] = Depends(get_authenticated_request)
 ) -> HistoricalDataResponse:
@@ -275,24 +427,21 @@ async def get_data_by_device(
     - `start_time`: Start time for data query
     - `end_time`: End time for data query
     - `sensor_type`: Optional filter by sensor type
+    - `limit`/`cursor`: Pagination, as for `/sensors/history`
 
     **Response:**
     - All historical data points for the specified device
     - Can be filtered by sensor type if device has multiple sensors
     """
-    return await get_historical_data(
+    query_params = _build_query_params(
         start_time=start_time,
         end_time=end_time,
         sensor_type=sensor_type,
-        device_id=device_id,
-        latitude_min=None,
-        latitude_max=None,
-        longitude_min=None,
-        longitude_max=None,
-        influxdb_service=influxdb_service,
-        api_key=api_key
+        device_id=device_id
     )
 
+    return await _run_history_query(request, query_params, influxdb_service, limit, cursor)
+
 
 @router.get(
     "/sensors/devices",
@@ -301,10 +450,11 @@ async def get_data_by_device(
     tags=["Devices"]
 )
 async def get_all_devices(
+    request: Request,
     sensor_type: Optional[SensorType] = Query(None, description="Filter devices by sensor type"),
     influxdb_service: InfluxDBService = Depends(get_influxdb_service),
     api_key: Optional[str] = Depends(get_authenticated_request)
-) -> DeviceListResponse:
+) -> Response:
     """
     Get list of all device IDs with their information.
 
@@ -323,15 +473,16 @@ async def get_all_devices(
     - Get all devices: `GET /api/v1/sensors/devices`
     - Get only temperature devices: `GET /api/v1/sensors/devices?sensor_type=temperature`
     """
-    start_query_time = time.time()
+    # Device list covers a rolling 30-day window and changes slowly, so it is
+    # cached server-side and refreshed at most once per TTL
+    cache_key = response_cache.build_key("devices", {"sensor_type": sensor_type})
+    cached_body = await response_cache.get(cache_key)
+    if cached_body is not None:
+        return _cached_json_response(request, cached_body, settings.device_list_cache_ttl)
 
     try:
-
-        # Get device list
-        devices = await influxdb_service.get_device_list(sensor_type)
-
-        execution_time = (time.time() - start_query_time) * 1000
-
+        # Get device list (shared by identical concurrent requests)
+        devices = await _run_once(cache_key, lambda: influxdb_service.get_device_list(sensor_type))
 
         response = DeviceListResponse(
             devices=devices,
@@ -339,17 +490,19 @@ async def get_all_devices(
             sensor_type_filter=sensor_type
         )
 
-        return response
-
-    except Exception as e:
-
-        print('get_all_devices Unexpected error:', e)
-
+    except Exception:
+        logger.exception("get_all_devices failed")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to retrieve device list"
         )
 
+    # Encoded once for the cache; returned bytes skip FastAPI's response_model pass
+    body = response.model_dump_json().encode('utf-8')
+    await response_cache.set(cache_key, body, expire=settings.device_list_cache_ttl)
+
+    return _cached_json_response(request, body, settings.device_list_cache_ttl)
+
 
 @router.get(
     "/sensors/stats",
@@ -358,9 +511,10 @@ async def get_all_devices(
     tags=["Statistics"]
 )
 async def get_sensor_stats(
+    request: Request,
     influxdb_service: InfluxDBService = Depends(get_influxdb_service),
     api_key: Optional[str] = Depends(get_authenticated_request)
-) -> SensorTypeStatsResponse:
+) -> Response:
     """
     Get comprehensive statistics for all sensor types.
 
@@ -377,33 +531,34 @@ async def get_sensor_stats(
     - Data quality assessment
     - Capacity planning
     """
-    start_query_time = time.time()
+    # Statistics cover a rolling 30-day window, so repeated polls within the TTL
+    # are answered from the cache without scanning InfluxDB
+    cache_key = response_cache.build_key("stats", {})
+    cached_body = await response_cache.get(cache_key)
+    if cached_body is not None:
+        return _cached_json_response(request, cached_body, settings.stats_cache_ttl)
+
+    async def query() -> List[Any]:
+        # Per-type and overall statistics are both computed by InfluxDB
+        return await asyncio.gather(
+            influxdb_service.get_sensor_type_stats(),
+            influxdb_service.get_overall_stats()
+        )
 
     try:
+        # Shared by identical concurrent requests
+        sensor_stats, overall_stats = await _run_once(cache_key, query)
+        total_devices, total_measurements, first_measurement, last_measurement = overall_stats
 
+        if first_measurement is None or last_measurement is None:
+            now = datetime.now(UTC)
+            first_measurement = first_measurement or now
+            last_measurement = last_measurement or now
 
-        # Get sensor type statistics
-        sensor_stats = await influxdb_service.get_sensor_type_stats()
-
-        execution_time = (time.time() - start_query_time) * 1000
-
-        # Calculate overall statistics
-        total_devices = sum(stat.device_count for stat in sensor_stats)
-        total_measurements = sum(stat.total_measurements for stat in sensor_stats)
-
-        # Find overall time range
-        if sensor_stats:
-            first_measurement = min(stat.first_measurement for stat in sensor_stats)
-            last_measurement = max(stat.last_measurement for stat in sensor_stats)
-            time_range = {
-                "first_measurement": first_measurement,
-                "last_measurement": last_measurement
-            }
-        else:
-            time_range = {
-                "first_measurement": datetime.now(UTC),
-                "last_measurement": datetime.now(UTC)
-            }
+        time_range = {
+            "first_measurement": first_measurement,
+            "last_measurement": last_measurement
+        }
 
         response = SensorTypeStatsResponse(
             stats=sensor_stats,
@@ -412,12 +567,15 @@ async def get_sensor_stats(
             time_range=time_range
         )
 
-        return response
-
-    except Exception as e:
-        print('get_sensor_stats Unexpected error:', e)
-
+    except Exception:
+        logger.exception("get_sensor_stats failed")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to retrieve sensor statistics"
         )
+
+    # Encoded once for the cache; returned bytes skip FastAPI's response_model pass
+    body = response.model_dump_json().encode('utf-8')
+    await response_cache.set(cache_key, body, expire=settings.stats_cache_ttl)
+
+    return _cached_json_response(request, body, settings.stats_cache_ttl)
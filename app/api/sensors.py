@@ -1,15 +1,80 @@
-from datetime import datetime
-from typing import Dict, Any, Optional
+import logging
+from datetime import datetime, UTC
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import ValidationError
+import orjson
+
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter, ValidationError
 
 from app.models.sensor import SensorData, SensorDataResponse
-from app.services.pubsub import PubSubService
-from app.api.deps import get_pubsub_service, get_authenticated_request
+from app.services.batcher import PublishBatcher
+from app.api.deps import get_publish_batcher, get_authenticated_request
+
+router = APIRouter(default_response_class=ORJSONResponse)
+logger = logging.getLogger(__name__)
+
+_SENSOR_DATA_ADAPTER = TypeAdapter(SensorData)
+
+# Request body schema for OpenAPI; SensorType is already a component via SensorDataResponse
+_SENSOR_DATA_SCHEMA = SensorData.model_json_schema(ref_template="#/components/schemas/{model}")
+_SENSOR_DATA_SCHEMA.pop("$defs", None)
+
+# /sensors/types response is static, so it is encoded once
+_SENSOR_TYPES_BYTES = orjson.dumps({
+    "supported_types": [
+        {
+            "type": "temperature",
+            "description": "Temperature sensor readings in Celsius",
+            "value_range": {
+                "min": -273.15,
+                "max": 1000,
+                "unit": "°C"
+            }
+        },
+        {
+            "type": "humidity",
+            "description": "Humidity sensor readings as percentage",
+            "value_range": {
+                "min": 0,
+                "max": 100,
+                "unit": "%"
+            }
+        },
+        {
+            "type": "ndir",
+            "description": "NDIR CO2 sensor readings",
+            "value_range": {
+                "min": 0,
+                "max": 50000,
+                "unit": "ppm"
+            }
+        }
+    ],
+    "validation_rules": {
+        "device_id": "Positive integer",
+        "latitude": "Float between -90 and 90",
+        "longitude": "Float between -180 and 180",
+        "timestamp": "ISO format datetime, not in future"
+    }
+})
 
-router = APIRouter()
-# logger = get_logger("sensor_api")
+
+def _parse_sensor_data(body: bytes) -> SensorData:
+    """
+    Decode and validate request body in a single pydantic-core pass.
+
+    Errors are reported in FastAPI's usual request validation format.
+    """
+    try:
+        return _SENSOR_DATA_ADAPTER.validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)],
+            body=body
+        )
 
 
 @router.post(
@@ -17,13 +82,19 @@ router = APIRouter()
     response_model=SensorDataResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Submit Sensor Data",
-    tags=["Sensors"]
+    tags=["Sensors"],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _SENSOR_DATA_SCHEMA}}
+        }
+    }
 )
 async def submit_sensor_data(
-    sensor_data: SensorData,
-    pubsub_service: PubSubService = Depends(get_pubsub_service),
+    request: Request,
+    publish_batcher: PublishBatcher = Depends(get_publish_batcher),
     api_key: Optional[str] = Depends(get_authenticated_request)
-) -> SensorDataResponse:
+) -> ORJSONResponse:
     """
     Submit sensor data from IoT devices.
 
@@ -41,7 +112,7 @@ async def submit_sensor_data(
     **Request Body:**
     - `device_id`: Unique identifier for the IoT device (positive integer)
     - `sensor_type`: Type of sensor (temperature, humidity, ndir)
-    - `value`: Sensor reading value (float/decimal)
+    - `value`: Sensor reading value (float)
     - `latitude`: Device location latitude (-90 to 90)
     - `longitude`: Device location longitude (-180 to 180)
     - `timestamp`: When the measurement was taken (ISO format)
@@ -49,48 +120,47 @@ async def submit_sensor_data(
     **Response:**
     - Confirmation of successful data reception and processing
     """
-    try:
+    # Body is validated directly from bytes instead of FastAPI's body parsing
+    sensor_data = _parse_sensor_data(await request.body())
 
-        # Convert to dictionary for Pub/Sub
-        sensor_dict = sensor_data.dict()
-        sensor_dict['sensor_type'] = sensor_data.sensor_type.value
-        sensor_dict['timestamp'] = sensor_data.timestamp.isoformat()
+    try:
+        # Encode Pub/Sub message once, in the cloud Avro schema shape: device_id,
+        # sensor_type, value, latitude, longitude and the ISO 8601 timestamp
+        payload = _SENSOR_DATA_ADAPTER.dump_json(sensor_data)
 
-        # Publish to Pub/Sub
+        # Publish to Pub/Sub (batched with concurrent requests). SensorType is a
+        # str enum, so the member itself keys the topic mapping without `.value`
         try:
-            message_id = pubsub_service.publish_sensor_data(
-                sensor_type=sensor_data.sensor_type.value,
-                data=sensor_dict
+            message_id = await publish_batcher.submit(
+                sensor_type=sensor_data.sensor_type,
+                payload=payload
             )
 
 
-        except Exception as pubsub_error:
-
-
-            print('Pub/Sub error:', pubsub_error)
-
+        except Exception:
+            logger.exception("Pub/Sub publish failed")
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Failed to process sensor data. Please try again later."
             )
 
-        return SensorDataResponse(
-            device_id=sensor_data.device_id,
-            sensor_type=sensor_data.sensor_type,
-            processed_at=datetime.utcnow()
+        # Built from trusted values, so returned directly instead of being
+        # validated again against response_model (kept for the OpenAPI schema)
+        return ORJSONResponse(
+            content={
+                "message": "Data received successfully",
+                "device_id": sensor_data.device_id,
+                "sensor_type": sensor_data.sensor_type,
+                "processed_at": datetime.now(UTC)
+            },
+            status_code=status.HTTP_201_CREATED
         )
 
-    except ValidationError as validation_error:
-        # Log validation error
-        print('Validation error:', validation_error)
-
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail=f"Data validation failed: {validation_error}"
-        )
+    except HTTPException:
+        raise
 
-    except Exception as unexpected_error:
-        print('Unexpected error:', unexpected_error)
+    except Exception:
+        logger.exception("submit_sensor_data failed")
 
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -105,7 +175,7 @@ async def submit_sensor_data(
 )
 async def get_supported_sensor_types(
     api_key: Optional[str] = Depends(get_authenticated_request)
-) -> Dict[str, Any]:
+) -> Response:
     """
     Get list of supported sensor types and their validation rules.
 
@@ -115,40 +185,4 @@ async def get_supported_sensor_types(
     **Response:**
     - List of supported sensor types with validation constraints
     """
-    return {
-        "supported_types": [
-            {
-                "type": "temperature",
-                "description": "Temperature sensor readings in Celsius",
-                "value_range": {
-                    "min": -273.15,
-                    "max": 1000,
-                    "unit": "°C"
-                }
-            },
-            {
-                "type": "humidity",
-                "description": "Humidity sensor readings as percentage",
-                "value_range": {
-                    "min": 0,
-                    "max": 100,
-                    "unit": "%"
-                }
-            },
-            {
-                "type": "ndir",
-                "description": "NDIR CO2 sensor readings",
-                "value_range": {
-                    "min": 0,
-                    "max": 50000,
-                    "unit": "ppm"
-                }
-            }
-        ],
-        "validation_rules": {
-            "device_id": "Positive integer",
-            "latitude": "Float between -90 and 90",
-            "longitude": "Float between -180 and 180",
-            "timestamp": "ISO format datetime, not in future"
-        }
-    }
+    return Response(content=_SENSOR_TYPES_BYTES, media_type="application/json")
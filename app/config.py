@@ -1,4 +1,6 @@
-from typing import Dict, List, ClassVar, Type, Any
+import os
+from functools import cached_property
+from typing import Dict, List, ClassVar, Type, Any, Optional
 
 from pydantic import field_validator
 from pydantic_settings import BaseSettings
@@ -12,6 +14,8 @@ class Settings(BaseSettings):
     host: str
     port: int
     debug: bool
+    # Worker processes for `python main.py` outside debug mode (one per core)
+    workers: int = max(1, os.cpu_count() or 1)
 
     # API Security
     api_keys: List[str] = []
@@ -28,8 +32,28 @@ class Settings(BaseSettings):
 
     # Pub/Sub client settings
     pubsub_timeout: float = 30.0
+    pubsub_probe_timeout: float = 5.0  # seconds per GetTopic call in warm-up and health checks, no retry
     pubsub_retry_attempts: int = 3
     pubsub_retry_delay: float = 1.0
+    # Client-side batching: a batch is sent when any limit is reached
+    pubsub_batch_max_messages: int = 100
+    pubsub_batch_max_bytes: int = 1_000_000
+    pubsub_batch_max_latency: float = 0.01  # seconds
+    # Publish flow control: publish() blocks while this much data is outstanding
+    pubsub_flow_control_max_messages: int = 1000
+    pubsub_flow_control_max_bytes: int = 10 * 1024 * 1024
+    # gzip publish requests on the wire; batched JSON payloads compress well
+    pubsub_enable_compression: bool = True
+    # Bulkhead: publishes beyond this many in flight wait briefly for a slot, then fail
+    pubsub_max_in_flight: int = 1000
+    pubsub_bulkhead_timeout: float = 0.05  # seconds
+    # Retry budget: each successful publish earns this fraction of a retry, capped at burst
+    pubsub_retry_budget_ratio: float = 0.1
+    pubsub_retry_budget_burst: int = 10
+
+    # Publish batching settings
+    publish_batch_max_messages: int = 100
+    publish_batch_max_latency: float = 0.01  # seconds
 
     # Circuit breaker settings
     circuit_breaker_failure_threshold: int = 5
@@ -48,11 +72,25 @@ class Settings(BaseSettings):
     influxdb_username: str = ""
     influxdb_password: str = ""
     influxdb_timeout: int = 30000  # milliseconds
+    influxdb_enable_gzip: bool = True  # Compress query responses (CSV compresses well)
+    influxdb_connection_pool_maxsize: int = 32  # Kept-alive connections; >= concurrent queries
+
+    # Response cache settings
+    cache_redis_url: str = ""  # In-memory cache is used when empty
+    cache_redis_timeout: float = 0.5  # seconds; a slow or unreachable Redis counts as a miss
+    history_cache_ttl: int = 30  # seconds
+    stats_cache_ttl: int = 60  # seconds
+    device_list_cache_ttl: int = 600  # seconds
+    health_cache_ttl: float = 3.0  # seconds
+    pubsub_health_probe_ttl: float = 10.0  # seconds a successful GetTopic probe is trusted
 
     # Logging settings
     log_level: str = "INFO"
     log_format: str = "json"
 
+    # Metrics settings
+    metrics_enabled: bool = True
+
     @field_validator('log_level')
     @classmethod
     def validate_log_level(cls, v):
@@ -62,15 +100,21 @@ class Settings(BaseSettings):
             raise ValueError(f'Log level must be one of: {valid_levels}')
         return v.upper()
 
-    @property
+    @cached_property
     def sensor_topic_mapping(self) -> Dict[str, str]:
-        """Map sensor types to their respective Pub/Sub topics"""
+        """Map sensor types to their respective Pub/Sub topics (built once, settings are immutable)"""
         return {
             "temperature": self.pubsub_topic_temperature,
             "humidity": self.pubsub_topic_humidity,
             "ndir": self.pubsub_topic_ndir
         }
 
+    @cached_property
+    def gcp_credentials_file(self) -> Optional[str]:
+        """Service account file to use, or None for Application Default Credentials (checked once)"""
+        path = self.gcp_credentials_path
+        return path if path and os.path.exists(path) else None
+
     class Config:
         env_prefix = "SENSORGATE_"
         case_sensitive = False
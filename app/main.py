@@ -1,9 +1,60 @@
+import asyncio
+import logging
+import queue
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.config import settings
 # from app.middleware.metrics import MetricsMiddleware
 from app.api import health, sensors, history, debug
+from app.services.cache import response_cache
+from app.services.batcher import publish_batcher
+from app.services.influxdb import influxdb_service
+from app.services.pubsub import pubsub_service
+
+
+def setup_logging() -> QueueListener:
+    """Route application logs through a queue so handler I/O runs off the event loop"""
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    )
+
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(settings.log_level)
+    app_logger.addHandler(QueueHandler(log_queue))
+    app_logger.propagate = False
+
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
+
+log_listener = setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown"""
+    response_cache.init()
+    # Build the InfluxDB and Pub/Sub clients per worker before serving, concurrently and
+    # off the first request's path; Pub/Sub also opens its channel to every topic
+    await asyncio.gather(
+        asyncio.to_thread(influxdb_service),
+        asyncio.to_thread(lambda: pubsub_service().warm_up())
+    )
+    batcher = publish_batcher()
+    batcher.start()
+    yield
+    await batcher.stop()
+    await response_cache.close()
+    log_listener.stop()
 
 
 # Create FastAPI application
@@ -14,7 +65,8 @@ app = FastAPI(
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
     openapi_url="/openapi.json" if settings.debug else None,
-    # lifespan=lifespan
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -31,7 +83,8 @@ app.add_middleware(
 app.include_router(health.router)
 app.include_router(sensors.router, prefix="/api/v1")
 app.include_router(history.router, prefix="/api/v1")
-app.include_router(debug.router, prefix="/api/v1")
+if settings.debug:
+    app.include_router(debug.router, prefix="/api/v1")
 
 
 @app.get("/", tags=["Root"])
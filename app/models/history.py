@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import List, Optional, Dict, Any
 from enum import Enum
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from app.models.sensor import SensorType
 
@@ -24,41 +24,39 @@ class HistoryQueryParams(BaseModel):
     end_time: datetime = Field(..., description="End time for data query (ISO 8601)")
     sensor_type: Optional[SensorType] = Field(None, description="Filter by sensor type")
     device_id: Optional[int] = Field(None, description="Filter by specific device ID", gt=0)
+    sensor_types: Optional[List[SensorType]] = Field(None, description="Filter by any of several sensor types")
+    device_ids: Optional[List[int]] = Field(None, description="Filter by any of several device IDs")
     latitude_min: Optional[float] = Field(None, description="Minimum latitude for location filter", ge=-90, le=90)
     latitude_max: Optional[float] = Field(None, description="Maximum latitude for location filter", ge=-90, le=90)
     longitude_min: Optional[float] = Field(None, description="Minimum longitude for location filter", ge=-180, le=180)
     longitude_max: Optional[float] = Field(None, description="Maximum longitude for location filter", ge=-180, le=180)
     aggregation: Optional[AggregationType] = Field(AggregationType.MEAN, description="Aggregation type for data")
 
-    @field_validator('end_time')
-    @classmethod
-    def validate_time_range(cls, v, info):
-        """Validate that end_time is after start_time"""
-        if 'start_time' in info.data and v <= info.data['start_time']:
-            raise ValueError("end_time must be after start_time")
-        return v
-
-    @field_validator('latitude_max')
-    @classmethod
-    def validate_latitude_range(cls, v, info):
-        """Validate latitude range"""
-        if v is not None and 'latitude_min' in info.data and info.data['latitude_min'] is not None:
-            if v <= info.data['latitude_min']:
-                raise ValueError("latitude_max must be greater than latitude_min")
-        return v
-
-    @field_validator('longitude_max')
-    @classmethod
-    def validate_longitude_range(cls, v, info):
-        """Validate longitude range"""
-        if v is not None and 'longitude_min' in info.data and info.data['longitude_min'] is not None:
-            if v <= info.data['longitude_min']:
-                raise ValueError("longitude_max must be greater than longitude_min")
-        return v
+    def range_error(self) -> Optional[str]:
+        """Check cross-field time and location ranges; returns error message or None"""
+        if self.end_time <= self.start_time:
+            return "end_time must be after start_time"
+        if (self.latitude_min is not None and self.latitude_max is not None
+                and self.latitude_max <= self.latitude_min):
+            return "latitude_max must be greater than latitude_min"
+        if (self.longitude_min is not None and self.longitude_max is not None
+                and self.longitude_max <= self.longitude_min):
+            return "longitude_max must be greater than longitude_min"
+        return None
+
+    @model_validator(mode='after')
+    def validate_ranges(self):
+        """Validate all ranges in a single pass after field validation"""
+        error = self.range_error()
+        if error:
+            raise ValueError(error)
+        return self
 
 
 class HistoricalDataPoint(BaseModel):
     """Single historical data point"""
+    model_config = ConfigDict(frozen=True)
+
     timestamp: datetime = Field(..., description="Measurement timestamp")
     device_id: int = Field(..., description="Device identifier")
     sensor_type: SensorType = Field(..., description="Type of sensor")
@@ -66,14 +64,11 @@ class HistoricalDataPoint(BaseModel):
     latitude: float = Field(..., description="Device latitude")
     longitude: float = Field(..., description="Device longitude")
 
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
-
 
 class AggregatedDataPoint(BaseModel):
     """Aggregated historical data point"""
+    model_config = ConfigDict(frozen=True)
+
     sensor_type: SensorType = Field(..., description="Type of sensor")
     device_id: Optional[int] = Field(None, description="Device identifier (if filtered by device)")
     aggregation_type: AggregationType = Field(..., description="Type of aggregation applied")
@@ -82,11 +77,6 @@ class AggregatedDataPoint(BaseModel):
     start_time: datetime = Field(..., description="Start time of aggregation period")
     end_time: datetime = Field(..., description="End time of aggregation period")
 
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
-
 
 class HistoricalDataResponse(BaseModel):
     """Response model for historical data queries"""
@@ -94,6 +84,7 @@ class HistoricalDataResponse(BaseModel):
     total_count: int = Field(..., description="Total number of data points")
     query_params: Dict[str, Any] = Field(..., description="Query parameters used")
     execution_time_ms: float = Field(..., description="Query execution time in milliseconds")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page (null on the last page)")
 
 
 class AggregatedDataResponse(BaseModel):
@@ -106,6 +97,8 @@ class AggregatedDataResponse(BaseModel):
 
 class DeviceInfo(BaseModel):
     """Device information model"""
+    model_config = ConfigDict(frozen=True)
+
     device_id: int = Field(..., description="Device identifier")
     sensor_types: List[SensorType] = Field(..., description="Types of sensors on this device")
     first_seen: datetime = Field(..., description="First data point timestamp")
@@ -113,11 +106,6 @@ class DeviceInfo(BaseModel):
     total_measurements: int = Field(..., description="Total number of measurements")
     last_location: Dict[str, float] = Field(..., description="Last known location")
 
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
-
 
 class DeviceListResponse(BaseModel):
     """Response model for device list queries"""
@@ -128,6 +116,8 @@ class DeviceListResponse(BaseModel):
 
 class SensorTypeStats(BaseModel):
     """Statistics for a sensor type"""
+    model_config = ConfigDict(frozen=True)
+
     sensor_type: SensorType = Field(..., description="Type of sensor")
     device_count: int = Field(..., description="Number of devices with this sensor type")
     total_measurements: int = Field(..., description="Total measurements for this sensor type")
@@ -135,11 +125,6 @@ class SensorTypeStats(BaseModel):
     last_measurement: datetime = Field(..., description="Last measurement timestamp")
     value_stats: Dict[str, float] = Field(..., description="Value statistics (min, max, mean)")
 
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
-
 
 class SensorTypeStatsResponse(BaseModel):
     """Response model for sensor type statistics"""
@@ -147,8 +132,3 @@ class SensorTypeStatsResponse(BaseModel):
     total_devices: int = Field(..., description="Total number of unique devices")
     total_measurements: int = Field(..., description="Total number of measurements")
     time_range: Dict[str, datetime] = Field(..., description="Overall time range of data")
-
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
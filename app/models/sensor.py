@@ -1,9 +1,7 @@
 from datetime import datetime, UTC
-from decimal import Decimal
 from enum import Enum
-from typing import Union
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_serializer, field_validator
 
 
 class SensorType(str, Enum):
@@ -13,13 +11,24 @@ class SensorType(str, Enum):
     NDIR = "ndir"
 
 
+# Valid value range per sensor type: (min, max, error message)
+_VALUE_RANGES = {
+    # Temperature in Celsius: -273.15 to 1000
+    SensorType.TEMPERATURE: (-273.15, 1000.0, "Temperature value out of valid range (-273.15 to 1000°C)"),
+    # Humidity percentage: 0 to 100
+    SensorType.HUMIDITY: (0.0, 100.0, "Humidity value out of valid range (0 to 100%)"),
+    # NDIR CO2 sensor: 0 to 50000 ppm
+    SensorType.NDIR: (0.0, 50000.0, "NDIR value out of valid range (0 to 50000 ppm)"),
+}
+
+
 class SensorData(BaseModel):
     """Model for sensor data validation"""
     device_id: int = Field(..., description="Unique device identifier", gt=0)
     sensor_type: SensorType = Field(..., description="Type of sensor")
-    value: Union[float, Decimal] = Field(..., description="Sensor reading value")
-    latitude: Union[float, Decimal] = Field(..., description="Device latitude", ge=-90, le=90)
-    longitude: Union[float, Decimal] = Field(..., description="Device longitude", ge=-180, le=180)
+    value: float = Field(..., description="Sensor reading value")
+    latitude: float = Field(..., description="Device latitude", ge=-90, le=90)
+    longitude: float = Field(..., description="Device longitude", ge=-180, le=180)
     timestamp: datetime = Field(..., description="Measurement timestamp")
 
     @field_validator('timestamp')
@@ -33,30 +42,18 @@ class SensorData(BaseModel):
     @field_validator('value')
     @classmethod
     def validate_sensor_value(cls, v, info):
-        """Validate sensor value based on sensor type"""
-        if 'sensor_type' in info.data:
-            sensor_type = info.data['sensor_type']
-
-            if sensor_type == SensorType.TEMPERATURE:
-                # Temperature in Celsius: -273.15 to 1000
-                if not -273.15 <= v <= 1000:
-                    raise ValueError("Temperature value out of valid range (-273.15 to 1000°C)")
-            elif sensor_type == SensorType.HUMIDITY:
-                # Humidity percentage: 0 to 100
-                if not 0 <= v <= 100:
-                    raise ValueError("Humidity value out of valid range (0 to 100%)")
-            elif sensor_type == SensorType.NDIR:
-                # NDIR CO2 sensor: 0 to 50000 ppm
-                if not 0 <= v <= 50000:
-                    raise ValueError("NDIR value out of valid range (0 to 50000 ppm)")
-
+        """Validate sensor value based on sensor type (one dict lookup instead of a type chain)"""
+        value_range = _VALUE_RANGES.get(info.data.get('sensor_type'))
+        if value_range is not None:
+            low, high, error = value_range
+            if not low <= v <= high:
+                raise ValueError(error)
         return v
 
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat(),
-            Decimal: lambda v: float(v)
-        }
+    @field_serializer('timestamp', when_used='json')
+    def serialize_timestamp(self, v: datetime) -> str:
+        """Keep the device's UTC offset (`+00:00`) in Pub/Sub messages instead of pydantic's `Z`"""
+        return v.isoformat()
 
 
 class SensorDataResponse(BaseModel):
@@ -65,8 +62,3 @@ class SensorDataResponse(BaseModel):
     device_id: int
     sensor_type: SensorType
     processed_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
-
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
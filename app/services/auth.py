@@ -1,4 +1,6 @@
+import logging
 from typing import Optional
+
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.security.api_key import APIKeyHeader
@@ -7,6 +9,8 @@ from app.config import settings
 # from app.core.logging import LoggerMixin
 
 
+logger = logging.getLogger(__name__)
+
 # API Key authentication scheme
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
@@ -18,9 +22,13 @@ class AuthService():
     """Authentication service for API key validation"""
 
     def __init__(self):
-        self.valid_api_keys = set(settings.api_keys)
+        self.valid_api_keys = frozenset(settings.api_keys)
         if not self.valid_api_keys:
-            print("No API keys configured - authentication will fail for all requests")
+            logger.warning("No API keys configured - all requests will be allowed")
+
+        # Settings are fixed for the process lifetime: with public access enabled
+        # or no API keys configured every request is allowed
+        self.allow_all = settings.public_access_enabled or not self.valid_api_keys
 
     def validate_api_key(self, api_key: str) -> bool:
         """Validate provided API key"""
@@ -29,19 +37,19 @@ class AuthService():
 
         is_valid = api_key in self.valid_api_keys
 
-        if not is_valid:
-            print('Invalid API key attempted:', api_key[:8] + '...')
+        if not is_valid and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Invalid API key attempted: %s...", api_key[:8])
 
         return is_valid
 
     def authenticate_request(self, api_key: Optional[str] = None) -> bool:
         """Authenticate incoming request"""
-        # Check if public access is enabled
-        if settings.public_access_enabled:
+        # Public access enabled, or no API keys configured (development mode)
+        if self.allow_all:
             return True
 
-        if not self.valid_api_keys:
-            # If no API keys are configured, allow all requests (development mode)
+        # Fast path for the common case: a single set probe for a valid key
+        if api_key in self.valid_api_keys:
             return True
 
         if not api_key:
@@ -0,0 +1,131 @@
+import asyncio
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import List, Optional, Set, Tuple
+
+from app.config import settings
+from app.services.pubsub import PubSubService, pubsub_service
+
+
+class PublishBatcher:
+    """
+    Coalesces sensor data publishes from concurrent requests into batches.
+
+    Requests enqueue their message and await a future; a background task drains
+    up to `max_batch_size` messages or waits at most `max_latency` seconds, then
+    hands the whole batch to the publisher in a worker thread and resolves each
+    future with that message's publish future. Batches are handed off concurrently,
+    so one blocked by flow control does not hold up the next. Requests then await
+    the publish result on the event loop, so no thread is held while Pub/Sub responds.
+    """
+
+    def __init__(self, service: PubSubService, max_batch_size: int = 100, max_latency: float = 0.01):
+        self.service = service
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._publishing: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Start background batching task (called on application startup)"""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Publish pending messages and stop background task"""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        try:
+            await self._task
+        finally:
+            self._task = None
+            if self._publishing:
+                await asyncio.gather(*self._publishing, return_exceptions=True)
+
+    async def submit(self, sensor_type: str, payload: bytes) -> str:
+        """Queue encoded sensor data for publishing and wait for its message ID"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((sensor_type, payload, future))
+        # One timeout covers both waiting for the hand-off and the publish itself
+        return await asyncio.wait_for(self._wait_published(future), settings.pubsub_timeout)
+
+    @staticmethod
+    async def _wait_published(future: asyncio.Future) -> str:
+        publish_future = await future
+        return await asyncio.wrap_future(publish_future)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        batch: List[Tuple[str, bytes, asyncio.Future]] = []
+
+        try:
+            while not stopping:
+                item = await self._queue.get()
+                if item is None:
+                    break
+
+                batch = [item]
+                deadline = loop.time() + self.max_latency
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+                task = asyncio.create_task(self._publish(batch))
+                self._publishing.add(task)
+                task.add_done_callback(self._publishing.discard)
+                batch = []
+        except BaseException as e:
+            # Fail the batch being collected and everything still queued, so their
+            # requests get an error instead of waiting out the timeout
+            error = e if isinstance(e, Exception) else RuntimeError("Publish batcher stopped")
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is not None:
+                    batch.append(item)
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            raise
+
+    async def _publish(self, batch: List[Tuple[str, bytes, asyncio.Future]]) -> None:
+        # Skip messages whose request already timed out or was cancelled
+        batch = [item for item in batch if not item[2].done()]
+        if not batch:
+            return
+        messages = [(sensor_type, payload) for sensor_type, payload, _ in batch]
+        try:
+            # Worker thread: publish() blocks while flow control limits are exceeded
+            publish_futures: List[Future] = await asyncio.to_thread(
+                self.service.publish_payload_batch, messages
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future), publish_future in zip(batch, publish_futures):
+            if not future.done():
+                future.set_result(publish_future)
+
+
+@lru_cache(maxsize=None)
+def publish_batcher() -> PublishBatcher:
+    """Global publish batcher instance, created on first use with the global PubSub service"""
+    return PublishBatcher(
+        pubsub_service(),
+        max_batch_size=settings.publish_batch_max_messages,
+        max_latency=settings.publish_batch_max_latency
+    )
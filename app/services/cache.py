@@ -0,0 +1,111 @@
+import hashlib
+import json
+import logging
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from redis import asyncio as aioredis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryCacheBackend:
+    """Process-local TTL cache backend (default when Redis is not configured)"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._store: Dict[str, Tuple[float, bytes]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get cached value if present and not expired"""
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._store.pop(key, None)
+            return None
+
+        return value
+
+    async def set(self, key: str, value: bytes, expire: int) -> None:
+        """Store value for `expire` seconds"""
+        if len(self._store) >= self.max_entries:
+            self._evict()
+        self._store[key] = (time.monotonic() + expire, value)
+
+    def _evict(self) -> None:
+        """Drop expired entries, then the oldest ones if still over capacity"""
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._store.items() if expires_at <= now]:
+            del self._store[key]
+
+        while len(self._store) >= self.max_entries:
+            del self._store[next(iter(self._store))]
+
+    async def close(self) -> None:
+        self._store.clear()
+
+
+class RedisCacheBackend:
+    """Redis cache backend shared by all service replicas"""
+
+    def __init__(self, url: str, timeout: float):
+        # Short timeouts so an unreachable Redis fails fast and is treated as a miss
+        self._redis = aioredis.from_url(url, socket_connect_timeout=timeout, socket_timeout=timeout)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: bytes, expire: int) -> None:
+        await self._redis.set(key, value, ex=expire)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class ResponseCache:
+    """Cache for encoded API responses keyed by normalized query parameters"""
+
+    def __init__(self, prefix: str = "sensorgate"):
+        self.prefix = prefix
+        self.backend = InMemoryCacheBackend()
+
+    def init(self) -> None:
+        """Switch to Redis backend if configured (called on application startup)"""
+        if settings.cache_redis_url:
+            self.backend = RedisCacheBackend(settings.cache_redis_url, settings.cache_redis_timeout)
+            logger.info('Response cache initialized with Redis backend')
+        else:
+            logger.info('Response cache initialized with in-memory backend')
+
+    def build_key(self, namespace: str, params: Dict[str, Any]) -> str:
+        """Build cache key from query parameters only"""
+        raw = json.dumps(params, sort_keys=True, default=str)
+        digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+        return f"{self.prefix}:{namespace}:{digest}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get cached response body; cache failures are treated as a miss"""
+        try:
+            return await self.backend.get(key)
+        except Exception as e:
+            logger.warning('Response cache get failed: %s', e)
+            return None
+
+    async def set(self, key: str, value: bytes, expire: int) -> None:
+        """Store response body; cache failures never fail the request"""
+        try:
+            await self.backend.set(key, value, expire)
+        except Exception as e:
+            logger.warning('Response cache set failed: %s', e)
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+# Global response cache instance
+response_cache = ResponseCache()
@@ -1,7 +1,13 @@
+import asyncio
+import logging
+import threading
 import time
-from datetime import datetime
-from typing import List, Optional, Dict, Any
-from influxdb_client import InfluxDBClient, Point
+from functools import lru_cache
+from datetime import datetime, UTC
+from typing import List, Optional, Dict, Any, Tuple, Callable, Iterator, AsyncIterator
+from influxdb_client import InfluxDBClient, Point, Dialect
+from influxdb_client.client.flux_csv_parser import FluxQueryException
+from influxdb_client.client.flux_table import FluxRecord
 from influxdb_client.client.query_api import QueryApi
 from influxdb_client.client.write_api import SYNCHRONOUS
 
@@ -13,6 +19,122 @@ from app.models.history import (
 )
 from app.models.sensor import SensorType
 
+logger = logging.getLogger(__name__)
+
+# Tag value -> SensorType; a dict lookup is much cheaper than SensorType(value) per record
+_SENSOR_TYPES = {sensor_type.value: sensor_type for sensor_type in SensorType}
+
+# Shared by all constructed history points; safe because the model is frozen
+_POINT_FIELDS_SET = frozenset(HistoricalDataPoint.model_fields)
+
+# Columns read from raw history rows; queries drop everything else server-side, after all
+# filters so the filters are still pushed down to storage
+_POINT_COLUMNS = '["_time", "_field", "_value", "device_id", "sensor_type", "latitude", "longitude"]'
+
+# Raw history rows are read as plain CSV (one header row per table, no annotations)
+_CSV_DIALECT = Dialect(header=True, annotations=[])
+# Pivoted history columns in HistoricalDataPoint field order, with values used when a column is absent
+_CSV_POINT_COLUMNS = (
+    ("_time", None), ("device_id", "0"), ("sensor_type", "temperature"),
+    ("value", "0.0"), ("latitude", "0.0"), ("longitude", "0.0")
+)
+
+# Flux reduce() step per aggregation: (initial value, next value from `r` and `accumulator`).
+# The accumulator also counts rows, so value and count come from a single scan
+_REDUCE_STEPS = {
+    AggregationType.MEAN: ("0.0", "accumulator.v + (r._value - accumulator.v) / float(v: accumulator.count + 1)"),
+    AggregationType.MIN: ('float(v: "+Inf")', "if r._value < accumulator.v then r._value else accumulator.v"),
+    AggregationType.MAX: ('float(v: "-Inf")', "if r._value > accumulator.v then r._value else accumulator.v"),
+    AggregationType.COUNT: ("0.0", "accumulator.v + 1.0"),
+    AggregationType.SUM: ("0.0", "accumulator.v + r._value"),
+    AggregationType.FIRST: ("0.0", "if accumulator.count == 0 then r._value else accumulator.v"),
+    AggregationType.LAST: ("0.0", "r._value")
+}
+
+def _flux_time(value: datetime) -> str:
+    """Format datetime as RFC3339 UTC for Flux; naive datetimes are treated as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _flux_strings(values: Tuple[Any, ...]) -> str:
+    """Flux string array literal; values are enum members or ints, never raw user text"""
+    return "[" + ", ".join(f'"{value}"' for value in values) + "]"
+
+
+@lru_cache(maxsize=1024)
+def _base_query(
+    bucket: str,
+    start: str,
+    stop: str,
+    sensor_type: Optional[str],
+    device_id: Optional[int],
+    sensor_types: Tuple[str, ...],
+    device_ids: Tuple[int, ...],
+    latitude_min: Optional[float],
+    latitude_max: Optional[float],
+    longitude_min: Optional[float],
+    longitude_max: Optional[float]
+) -> str:
+    """Build base Flux query; cached since dashboards repeat the same query shapes"""
+    query_parts = [
+        f'from(bucket: "{bucket}")',
+        f'|> range(start: {start}, stop: {stop})',
+        '|> filter(fn: (r) => r["_measurement"] == "sensor_data")'
+    ]
+
+    # Add sensor type filter
+    if sensor_type:
+        query_parts.append(f'|> filter(fn: (r) => r["sensor_type"] == "{sensor_type}")')
+
+    # Add device ID filter
+    if device_id:
+        query_parts.append(f'|> filter(fn: (r) => r["device_id"] == "{device_id}")')
+
+    # Set membership in one filter (pushed down like equality) instead of a query per value
+    if sensor_types:
+        query_parts.append(f'|> filter(fn: (r) => contains(value: r["sensor_type"], set: {_flux_strings(sensor_types)}))')
+    if device_ids:
+        query_parts.append(f'|> filter(fn: (r) => contains(value: r["device_id"], set: {_flux_strings(device_ids)}))')
+
+    # Add location filters
+    if latitude_min is not None:
+        query_parts.append(f'|> filter(fn: (r) => r["latitude"] >= {latitude_min})')
+    if latitude_max is not None:
+        query_parts.append(f'|> filter(fn: (r) => r["latitude"] <= {latitude_max})')
+    if longitude_min is not None:
+        query_parts.append(f'|> filter(fn: (r) => r["longitude"] >= {longitude_min})')
+    if longitude_max is not None:
+        query_parts.append(f'|> filter(fn: (r) => r["longitude"] <= {longitude_max})')
+
+    return '\n  '.join(query_parts)
+
+
+@lru_cache(maxsize=1024)
+def _aggregation_query(base_query: str, aggregation: AggregationType) -> str:
+    """Add aggregation to base query; cached since dashboards repeat the same query shapes"""
+    initial, step = _REDUCE_STEPS.get(aggregation, _REDUCE_STEPS[AggregationType.MEAN])
+
+    # first/last depend on row order, which group() does not preserve
+    ordered = aggregation in (AggregationType.FIRST, AggregationType.LAST)
+    order = '\n  |> sort(columns: ["_time"])' if ordered else ""
+    columns = '["_time", "_value", "sensor_type", "device_id"]' if ordered else '["_value", "sensor_type", "device_id"]'
+
+    return f"""
+{base_query}
+  |> filter(fn: (r) => r["_field"] == "value")
+  |> keep(columns: {columns})
+  |> group(columns: ["sensor_type", "device_id"])
+  |> toFloat(){order}
+  |> reduce(
+      identity: {{count: 0, v: {initial}}},
+      fn: (r, accumulator) => ({{count: accumulator.count + 1, v: {step}}})
+  )
+  |> yield(name: "aggregated")
+"""
+
+
 # class InfluxDBService(LoggerMixin):
 class InfluxDBService:
     """Service for interacting with InfluxDB for historical sensor data"""
@@ -31,298 +153,305 @@ class InfluxDBService:
                 url=settings.influxdb_url,
                 token=settings.influxdb_token,
                 org=self.org,
-                timeout=settings.influxdb_timeout
+                timeout=settings.influxdb_timeout,
+                enable_gzip=settings.influxdb_enable_gzip,
+                # Queries run in the default thread pool (at most 32 workers); a pool at
+                # least that large lets every concurrent query reuse a kept-alive connection
+                connection_pool_maxsize=settings.influxdb_connection_pool_maxsize
             )
             self.query_api = self.client.query_api()
-            print('InfluxDB client initialized successfully',
-                  'url:', settings.influxdb_url,
-                  'org:',self.org,
-                  'bucket:',self.bucket)
+            logger.info('InfluxDB client initialized url=%s org=%s bucket=%s',
+                        settings.influxdb_url, self.org, self.bucket)
 
         except Exception as e:
-            print('Failed to initialize InfluxDB client:', e)
+            logger.error('Failed to initialize InfluxDB client: %s', e)
             raise
 
+    async def _iter_in_thread(self, produce: Callable[[], Iterator[Any]], chunk_size: int = 500) -> AsyncIterator[Any]:
+        """
+        Run blocking row iterator in a worker thread and yield its rows as they arrive.
+
+        Rows are handed over in chunks through a bounded queue, so the thread pauses
+        when the consumer falls behind. Stopping iteration early stops the thread
+        at its next row.
+        """
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue(maxsize=4)
+        stopped = threading.Event()
+        done = object()
+
+        def put(item: Any) -> None:
+            asyncio.run_coroutine_threadsafe(chunks.put(item), loop).result()
+
+        def run() -> None:
+            chunk = []
+            try:
+                for row in produce():
+                    if stopped.is_set():
+                        return
+                    chunk.append(row)
+                    if len(chunk) >= chunk_size:
+                        put(chunk)
+                        chunk = []
+                put(chunk)
+                put(done)
+            except Exception as e:
+                put(e)
+
+        loop.run_in_executor(None, run)
+        try:
+            while (item := await chunks.get()) is not done:
+                if isinstance(item, Exception):
+                    raise item
+                for row in item:
+                    yield row
+        finally:
+            # Unblock a thread waiting on a full queue so it can see the stop flag
+            stopped.set()
+            while not chunks.empty():
+                chunks.get_nowait()
+
+    def _iter_points_csv(self, query: str) -> Iterator[Tuple[HistoricalDataPoint, Tuple[str, str, str]]]:
+        """
+        Run raw history query and build points straight from CSV rows (blocking).
+
+        Bypasses FluxRecord construction and the per-cell type conversion of the Flux
+        CSV parser: column positions are resolved once per table header and each
+        value is converted exactly once. The v2 Flux API only returns annotated CSV;
+        columnar Arrow results require an InfluxDB 3 server and SQL queries.
+
+        Yields (point, key) pairs where key is the raw (_time, device_id, sensor_type)
+        row position used by pagination cursors; the raw `_time` keeps InfluxDB's
+        nanosecond precision.
+        """
+        positions = None
+        padding = None
+
+        rows = self.query_api.query_csv(query, org=self.org, dialect=_CSV_DIALECT)
+        for row in rows:
+            if row[1] == "error":
+                # Error table: header row followed by the error message and reference
+                error = next(rows, ["", "", ""])
+                raise FluxQueryException(message=error[1], reference=error[2] if len(error) > 2 else "")
+
+            if row[1] == "result":
+                # Table header; absent columns read their default from padding appended to rows
+                header = {name: index for index, name in enumerate(row)}
+                padding = [default for name, default in _CSV_POINT_COLUMNS if name not in header]
+                padded = iter(range(len(row), len(row) + len(padding)))
+                positions = [header[name] if name in header else next(padded) for name, _ in _CSV_POINT_COLUMNS]
+                continue
+
+            if padding:
+                row = row + padding
+            try:
+                timestamp, device_id, sensor_type, value, latitude, longitude = (row[i] for i in positions)
+                point = HistoricalDataPoint.model_construct(
+                    _fields_set=_POINT_FIELDS_SET,
+                    timestamp=datetime.fromisoformat(timestamp),
+                    device_id=int(device_id),
+                    sensor_type=_SENSOR_TYPES[sensor_type],
+                    value=float(value),
+                    latitude=float(latitude),
+                    longitude=float(longitude)
+                )
+                yield point, (timestamp, device_id, sensor_type)
+            except (ValueError, TypeError, KeyError) as e:
+                logger.warning('Skipping invalid data point: %s record: %s', e, row)
+
     def _build_base_query(self, params: HistoryQueryParams) -> str:
-        """Build base Flux query from parameters"""
-        query_parts = [
-            f'from(bucket: "{self.bucket}")',
-            f'|> range(start: {params.start_time.isoformat()}Z, stop: {params.end_time.isoformat()}Z)',
-            '|> filter(fn: (r) => r["_measurement"] == "sensor_data")'
-        ]
-
-        # Add sensor type filter
-        if params.sensor_type:
-            query_parts.append(f'|> filter(fn: (r) => r["sensor_type"] == "{params.sensor_type.value}")')
-
-        # Add device ID filter
-        if params.device_id:
-            query_parts.append(f'|> filter(fn: (r) => r["device_id"] == "{params.device_id}")')
-
-        # Add location filters
-        if params.latitude_min is not None:
-            query_parts.append(f'|> filter(fn: (r) => r["latitude"] >= {params.latitude_min})')
-        if params.latitude_max is not None:
-            query_parts.append(f'|> filter(fn: (r) => r["latitude"] <= {params.latitude_max})')
-        if params.longitude_min is not None:
-            query_parts.append(f'|> filter(fn: (r) => r["longitude"] >= {params.longitude_min})')
-        if params.longitude_max is not None:
-            query_parts.append(f'|> filter(fn: (r) => r["longitude"] <= {params.longitude_max})')
-
-        return '\n  '.join(query_parts)
+        """Build base Flux query from parameters (memoized per query shape)"""
+        return _base_query(
+            self.bucket,
+            _flux_time(params.start_time),
+            _flux_time(params.end_time),
+            params.sensor_type.value if params.sensor_type else None,
+            params.device_id,
+            tuple(sorted({sensor_type.value for sensor_type in params.sensor_types or ()})),
+            tuple(sorted(set(params.device_ids or ()))),
+            params.latitude_min,
+            params.latitude_max,
+            params.longitude_min,
+            params.longitude_max
+        )
 
     def _build_aggregation_query(self, base_query: str, aggregation: AggregationType) -> str:
-        """Add aggregation to base query"""
-        aggregation_map = {
-            AggregationType.MEAN: "mean",
-            AggregationType.MIN: "min",
-            AggregationType.MAX: "max",
-            AggregationType.COUNT: "count",
-            AggregationType.SUM: "sum",
-            AggregationType.FIRST: "first",
-            AggregationType.LAST: "last"
-        }
-
-        agg_func = aggregation_map.get(aggregation, "mean")
-
-        query = f"""
-{base_query}
-  |> filter(fn: (r) => r["_field"] == "value")
-  |> group(columns: ["sensor_type", "device_id"])
-  |> {agg_func}()
-  |> yield(name: "aggregated")
-"""
-        return query
-
-    async def query_historical_data(self, params: HistoryQueryParams) -> List[HistoricalDataPoint]:
-        """Query historical sensor data points"""
+        """Add aggregation to base query; each row carries the aggregate (`v`) and row `count`"""
+        return _aggregation_query(base_query, aggregation)
+
+    async def query_historical_page(
+        self,
+        params: HistoryQueryParams,
+        limit: int,
+        after: Optional[Tuple[str, str, str]] = None
+    ) -> Tuple[List[HistoricalDataPoint], Optional[Tuple[str, str, str]]]:
+        """
+        Query one page of historical sensor data points.
+
+        Rows are ordered by their (_time, device_id, sensor_type) key, which is unique
+        per point, and at most `limit` rows strictly after the `after` key are returned.
+        Also returns the key of the last row when another page follows, else None.
+        """
         start_time = time.time()
 
         try:
-            base_query = self._build_base_query(params)
+            after_filter = ""
+            if after:
+                after_time, after_device, after_type = after
+                after_filter = (
+                    f'|> filter(fn: (r) => r._time > time(v: "{after_time}") or '
+                    f'(r._time == time(v: "{after_time}") and (r.device_id > "{after_device}" or '
+                    f'(r.device_id == "{after_device}" and r.sensor_type > "{after_type}"))))'
+                )
+            # The cursor filter only uses _time and tags, so it runs before pivot and
+            # is pushed down with the other filters. One extra row tells whether
+            # another page follows
             query = f"""
-{base_query}
+{self._build_base_query(params)}
+  {after_filter}
+  |> keep(columns: {_POINT_COLUMNS})
   |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
-  |> sort(columns: ["_time"])
+  |> group()
+  |> sort(columns: ["_time", "device_id", "sensor_type"])
+  |> limit(n: {limit + 1})
 """
-
-            # self.logger.info("Executing InfluxDB query for historical data",
-            #                start_time=params.start_time.isoformat(),
-            #                end_time=params.end_time.isoformat(),
-            #                sensor_type=params.sensor_type.value if params.sensor_type else None,
-            #                device_id=params.device_id)
-
-            tables = self.query_api.query(query, org=self.org)
-
-            data_points = []
-            for table in tables:
-                for record in table.records:
-                    try:
-                        data_point = HistoricalDataPoint(
-                            timestamp=record.get_time(),
-                            device_id=int(record.values.get("device_id", 0)),
-                            sensor_type=SensorType(record.values.get("sensor_type", "temperature")),
-                            value=float(record.values.get("value", 0.0)),
-                            latitude=float(record.values.get("latitude", 0.0)),
-                            longitude=float(record.values.get("longitude", 0.0))
-                        )
-                        data_points.append(data_point)
-                    except (ValueError, TypeError) as e:
-                        print('Skipping invalid data point:', e, 'record:', record.values)
-                        continue
-
-            return data_points
+            rows = [row async for row in self._iter_in_thread(lambda: self._iter_points_csv(query))]
 
         except Exception as e:
             execution_time = (time.time() - start_time) * 1000
-            print('Failed to query historical data:', e,)
+            logger.error('Failed to query historical data after %.0f ms: %s', execution_time, e)
             raise
 
+        next_key = rows[limit - 1][1] if len(rows) > limit else None
+        return [point for point, _ in rows[:limit]], next_key
+
     async def query_aggregated_data(self, params: HistoryQueryParams) -> List[AggregatedDataPoint]:
-        """Query aggregated historical sensor data"""
+        """Query aggregated historical sensor data (see `iter_aggregated_data`)"""
+        return [point async for point in self.iter_aggregated_data(params)]
+
+    async def iter_aggregated_data(self, params: HistoryQueryParams) -> AsyncIterator[AggregatedDataPoint]:
+        """Yield aggregated historical sensor data as it is read from InfluxDB"""
         start_time = time.time()
 
         try:
             base_query = self._build_base_query(params)
             query = self._build_aggregation_query(base_query, params.aggregation)
 
-            tables = self.query_api.query(query, org=self.org)
-
-            # Also get count for each aggregation
-            count_query = self._build_aggregation_query(base_query, AggregationType.COUNT)
-            count_tables = self.query_api.query(count_query, org=self.org)
-
-            # Create mapping of (sensor_type, device_id) -> count
-            count_map = {}
-            for table in count_tables:
-                for record in table.records:
-                    key = (record.values.get("sensor_type"), record.values.get("device_id"))
-                    count_map[key] = int(record.get_value() or 0)
+            def parse_record(record: FluxRecord) -> Optional[AggregatedDataPoint]:
+                # Columns are read straight from the record dict, once each
+                values = record.values
+                try:
+                    device_id = values.get("device_id")
+
+                    return AggregatedDataPoint(
+                        sensor_type=_SENSOR_TYPES[values["sensor_type"]],
+                        device_id=int(device_id) if device_id else None,
+                        aggregation_type=params.aggregation,
+                        value=float(values["v"] or 0.0),
+                        count=int(values["count"] or 0),
+                        start_time=params.start_time,
+                        end_time=params.end_time
+                    )
+                except (ValueError, TypeError, KeyError) as e:
+                    logger.warning('Skipping invalid aggregated point: %s record: %s', e, values)
+                    return None
 
-            aggregated_points = []
-            for table in tables:
-                for record in table.records:
-                    try:
-                        sensor_type = record.values.get("sensor_type")
-                        device_id = record.values.get("device_id")
-                        key = (sensor_type, device_id)
-                        count = count_map.get(key, 0)
-
-                        aggregated_point = AggregatedDataPoint(
-                            sensor_type=SensorType(sensor_type),
-                            device_id=int(device_id) if device_id else None,
-                            aggregation_type=params.aggregation,
-                            value=float(record.get_value() or 0.0),
-                            count=count,
-                            start_time=params.start_time,
-                            end_time=params.end_time
-                        )
-                        aggregated_points.append(aggregated_point)
-                    except (ValueError, TypeError) as e:
-                        print("Skipping invalid aggregated point:", e, "record:", record.values)
-                        continue
+            def produce() -> Iterator[AggregatedDataPoint]:
+                # Records are parsed as streamed, never materialized into FluxTables
+                for record in self.query_api.query_stream(query, org=self.org):
+                    point = parse_record(record)
+                    if point is not None:
+                        yield point
 
-            return aggregated_points
+            async for point in self._iter_in_thread(produce):
+                yield point
 
         except Exception as e:
             execution_time = (time.time() - start_time) * 1000
-            print('Failed to query aggregated data:', e)
+            logger.error('Failed to query aggregated data after %.0f ms: %s', execution_time, e)
             raise
 
     async def get_device_list(self, sensor_type: Optional[SensorType] = None) -> List[DeviceInfo]:
-        """Get list of all devices with their information"""
+        """Get list of all devices with their information (single query for all devices)"""
         start_time = time.time()
 
         try:
-            # Base query for device info
             sensor_filter = f'|> filter(fn: (r) => r["sensor_type"] == "{sensor_type.value}")' if sensor_type else ""
 
             query = f"""
-import "experimental/aggregate"
-
-devices = from(bucket: "{self.bucket}")
-  |> range(start: -30d)
-  |> filter(fn: (r) => r["_measurement"] == "sensor_data")
-  {sensor_filter}
-  |> group(columns: ["device_id"])
-  |> aggregate.rate(every: 30d, unit: 1h)
-  |> group()
-  |> keep(columns: ["device_id"])
-  |> distinct(column: "device_id")
-
-devices
-"""
-
-            tables = self.query_api.query(query, org=self.org)
-            device_ids = []
-            for table in tables:
-                for record in table.records:
-                    device_id = record.values.get("device_id")
-                    if device_id:
-                        device_ids.append(int(device_id))
-
-            # Get detailed info for each device
-            devices = []
-            for device_id in device_ids:
-                device_info = await self._get_device_info(device_id, sensor_type)
-                if device_info:
-                    devices.append(device_info)
-            return devices
-
-        except Exception as e:
-            print('Failed to get device list:', e)
-            raise
-
-    async def _get_device_info(self, device_id: int, sensor_type_filter: Optional[SensorType] = None) -> Optional[DeviceInfo]:
-        """Get detailed information for a specific device"""
-        try:
-            sensor_filter = f'|> filter(fn: (r) => r["sensor_type"] == "{sensor_type_filter.value}")' if sensor_type_filter else ""
-
-            query = f"""
-device_data = from(bucket: "{self.bucket}")
+data = from(bucket: "{self.bucket}")
   |> range(start: -30d)
   |> filter(fn: (r) => r["_measurement"] == "sensor_data")
-  |> filter(fn: (r) => r["device_id"] == "{device_id}")
   {sensor_filter}
 
-sensor_types = device_data
-  |> keep(columns: ["sensor_type"])
-  |> distinct(column: "sensor_type")
-
-stats = device_data
+values = data
   |> filter(fn: (r) => r["_field"] == "value")
-  |> group(columns: ["device_id"])
-  |> aggregateWindow(every: 30d, fn: count)
-  |> yield(name: "count")
-
-first_last = device_data
-  |> filter(fn: (r) => r["_field"] == "value")  
-  |> group(columns: ["device_id"])
-  |> first()
-  |> set(key: "stat", value: "first")
-  |> union(tables: [
-      device_data
-      |> filter(fn: (r) => r["_field"] == "value")
-      |> group(columns: ["device_id"])
-      |> last()
-      |> set(key: "stat", value: "last")
-  ])
-
-location = device_data
-  |> filter(fn: (r) => r["_field"] == "latitude" or r["_field"] == "longitude")
-  |> group(columns: ["device_id"])
-  |> last()
-  |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+  |> keep(columns: ["_time", "_value", "device_id", "sensor_type"])
+
+// min/max by _time instead of first()/last(): group() does not preserve row order
+union(tables: [
+  values |> group(columns: ["device_id", "sensor_type"]) |> count() |> set(key: "stat", value: "count"),
+  values |> group(columns: ["device_id"]) |> min(column: "_time") |> set(key: "stat", value: "first"),
+  values |> group(columns: ["device_id"]) |> max(column: "_time") |> set(key: "stat", value: "last"),
+  data
+    |> filter(fn: (r) => r["_field"] == "latitude" or r["_field"] == "longitude")
+    |> keep(columns: ["_time", "_field", "_value", "device_id"])
+    |> group(columns: ["device_id", "_field"])
+    |> max(column: "_time")
+    |> set(key: "stat", value: "location")
+])
 """
 
-            tables = self.query_api.query(query, org=self.org)
+            tables = await asyncio.to_thread(self.query_api.query, query, org=self.org)
 
-            sensor_types = []
-            total_measurements = 0
-            first_seen = None
-            last_seen = None
-            last_location = {"latitude": 0.0, "longitude": 0.0}
+            # Walk all result tables once, collecting stats per device
+            stats_by_device: Dict[int, Dict[str, Any]] = {}
 
             for table in tables:
-                table_name = table.records[0].table if table.records else 0
-
                 for record in table.records:
-                    if "sensor_type" in record.values:
-                        sensor_type_str = record.values.get("sensor_type")
-                        try:
-                            sensor_types.append(SensorType(sensor_type_str))
-                        except ValueError:
-                            continue
-
-                    elif record.values.get("stat") == "first":
-                        first_seen = record.get_time()
-                    elif record.values.get("stat") == "last":
-                        last_seen = record.get_time()
-
-                    elif record.values.get("_field") == "value" and "count" in str(table_name):
-                        total_measurements += int(record.get_value() or 0)
+                    values = record.values
+                    try:
+                        device_id = int(values["device_id"])
+                    except (ValueError, TypeError, KeyError):
+                        continue
 
-                    elif "latitude" in record.values and "longitude" in record.values:
-                        last_location = {
-                            "latitude": float(record.values.get("latitude", 0.0)),
-                            "longitude": float(record.values.get("longitude", 0.0))
+                    stats = stats_by_device.get(device_id)
+                    if stats is None:
+                        stats = stats_by_device[device_id] = {
+                            "sensor_types": [],
+                            "total_measurements": 0,
+                            "first_seen": None,
+                            "last_seen": None,
+                            "last_location": {"latitude": 0.0, "longitude": 0.0}
                         }
 
-            if not sensor_types or not first_seen or not last_seen:
-                return None
+                    stat_type = values.get("stat")
+                    if stat_type == "count":
+                        device_sensor_type = _SENSOR_TYPES.get(values.get("sensor_type"))
+                        if device_sensor_type is None:
+                            continue
+                        if device_sensor_type not in stats["sensor_types"]:
+                            stats["sensor_types"].append(device_sensor_type)
+                        stats["total_measurements"] += int(values.get("_value") or 0)
+                    elif stat_type == "first":
+                        stats["first_seen"] = values.get("_time")
+                    elif stat_type == "last":
+                        stats["last_seen"] = values.get("_time")
+                    elif stat_type == "location":
+                        stats["last_location"][values.get("_field")] = float(values.get("_value") or 0.0)
 
-            return DeviceInfo(
-                device_id=device_id,
-                sensor_types=list(set(sensor_types)),  # Remove duplicates
-                first_seen=first_seen,
-                last_seen=last_seen,
-                total_measurements=total_measurements,
-                last_location=last_location
-            )
+            devices = []
+            for device_id in sorted(stats_by_device):
+                stats = stats_by_device[device_id]
+                if not stats["sensor_types"] or not stats["first_seen"] or not stats["last_seen"]:
+                    continue
+
+                devices.append(DeviceInfo(device_id=device_id, **stats))
+            return devices
 
         except Exception as e:
-            print('Failed to get info for device', device_id, ':', e)
-            return None
+            logger.error('Failed to get device list: %s', e)
+            raise
 
     async def get_sensor_type_stats(self) -> List[SensorTypeStats]:
         """Get statistics for each sensor type"""
@@ -334,52 +463,47 @@ data = from(bucket: "{self.bucket}")
   |> range(start: -30d)
   |> filter(fn: (r) => r["_measurement"] == "sensor_data")
   |> filter(fn: (r) => r["_field"] == "value")
+  |> keep(columns: ["_time", "_value", "device_id", "sensor_type"])
+  |> group(columns: ["sensor_type"])
 
 device_counts = data
-  |> group(columns: ["sensor_type"])
   |> distinct(column: "device_id")
   |> count()
   |> set(key: "stat", value: "device_count")
 
-measurement_counts = data
-  |> group(columns: ["sensor_type"])
-  |> count()
-  |> set(key: "stat", value: "measurement_count")
-
+// Count, min, max, mean and time range in a single pass over each sensor type
 value_stats = data
-  |> group(columns: ["sensor_type"])
-  |> aggregateWindow(every: 30d, fn: mean)
-  |> set(key: "stat", value: "mean")
-  |> union(tables: [
-      data |> group(columns: ["sensor_type"]) |> min() |> set(key: "stat", value: "min"),
-      data |> group(columns: ["sensor_type"]) |> max() |> set(key: "stat", value: "max")
-  ])
-
-time_range = data
-  |> group(columns: ["sensor_type"])
-  |> first()
-  |> set(key: "stat", value: "first")
-  |> union(tables: [
-      data |> group(columns: ["sensor_type"]) |> last() |> set(key: "stat", value: "last")
-  ])
-
-union(tables: [device_counts, measurement_counts, value_stats, time_range])
+  |> toFloat()
+  |> reduce(
+      identity: {{
+          count: 0, sum: 0.0, min: float(v: "+Inf"), max: float(v: "-Inf"),
+          first: time(v: "2262-04-11T00:00:00Z"), last: time(v: 0)
+      }},
+      fn: (r, accumulator) => ({{
+          count: accumulator.count + 1,
+          sum: accumulator.sum + r._value,
+          min: if r._value < accumulator.min then r._value else accumulator.min,
+          max: if r._value > accumulator.max then r._value else accumulator.max,
+          first: if r._time < accumulator.first then r._time else accumulator.first,
+          last: if r._time > accumulator.last then r._time else accumulator.last
+      }})
+  )
+  |> map(fn: (r) => ({{r with mean: r.sum / float(v: r.count), stat: "values"}}))
+
+union(tables: [device_counts, value_stats])
 """
 
-            tables = self.query_api.query(query, org=self.org)
+            # Blocking client call runs in a worker thread so concurrent stats queries overlap
+            tables = await asyncio.to_thread(self.query_api.query, query, org=self.org)
 
             # Group results by sensor type
             stats_by_type = {}
 
             for table in tables:
                 for record in table.records:
-                    sensor_type_str = record.values.get("sensor_type")
-                    if not sensor_type_str:
-                        continue
-
-                    try:
-                        sensor_type = SensorType(sensor_type_str)
-                    except ValueError:
+                    values = record.values
+                    sensor_type = _SENSOR_TYPES.get(values.get("sensor_type"))
+                    if sensor_type is None:
                         continue
 
                     if sensor_type not in stats_by_type:
@@ -391,19 +515,20 @@ union(tables: [device_counts, measurement_counts, value_stats, time_range])
                             "value_stats": {"min": 0.0, "max": 0.0, "mean": 0.0}
                         }
 
-                    stat_type = record.values.get("stat")
-                    value = record.get_value()
+                    stat_type = values.get("stat")
+                    stats = stats_by_type[sensor_type]
 
                     if stat_type == "device_count":
-                        stats_by_type[sensor_type]["device_count"] = int(value or 0)
-                    elif stat_type == "measurement_count":
-                        stats_by_type[sensor_type]["total_measurements"] = int(value or 0)
-                    elif stat_type == "first":
-                        stats_by_type[sensor_type]["first_measurement"] = record.get_time()
-                    elif stat_type == "last":
-                        stats_by_type[sensor_type]["last_measurement"] = record.get_time()
-                    elif stat_type in ["min", "max", "mean"]:
-                        stats_by_type[sensor_type]["value_stats"][stat_type] = float(value or 0.0)
+                        stats["device_count"] = int(values.get("_value") or 0)
+                    elif stat_type == "values":
+                        stats["total_measurements"] = int(values.get("count") or 0)
+                        stats["first_measurement"] = values.get("first")
+                        stats["last_measurement"] = values.get("last")
+                        stats["value_stats"] = {
+                            "min": float(values.get("min") or 0.0),
+                            "max": float(values.get("max") or 0.0),
+                            "mean": float(values.get("mean") or 0.0)
+                        }
 
             # Convert to response models
             sensor_stats = []
@@ -421,7 +546,57 @@ union(tables: [device_counts, measurement_counts, value_stats, time_range])
             return sensor_stats
 
         except Exception as e:
-            print('Failed to get sensor type stats:', e)
+            logger.error('Failed to get sensor type stats: %s', e)
+            raise
+
+    async def get_overall_stats(self) -> Tuple[int, int, Optional[datetime], Optional[datetime]]:
+        """
+        Get overall statistics across all sensor types.
+
+        Returns (total_devices, total_measurements, first_measurement, last_measurement);
+        timestamps are None when there is no data.
+        """
+        try:
+            query = f"""
+data = from(bucket: "{self.bucket}")
+  |> range(start: -30d)
+  |> filter(fn: (r) => r["_measurement"] == "sensor_data")
+  |> filter(fn: (r) => r["_field"] == "value")
+  |> keep(columns: ["_time", "_value", "device_id"])
+  |> group()
+
+union(tables: [
+  data |> distinct(column: "device_id") |> count() |> set(key: "stat", value: "device_count"),
+  data |> count() |> set(key: "stat", value: "measurement_count"),
+  data |> min(column: "_time") |> set(key: "stat", value: "first"),
+  data |> max(column: "_time") |> set(key: "stat", value: "last")
+])
+"""
+
+            tables = await asyncio.to_thread(self.query_api.query, query, org=self.org)
+
+            total_devices = 0
+            total_measurements = 0
+            first_measurement = None
+            last_measurement = None
+
+            for table in tables:
+                for record in table.records:
+                    values = record.values
+                    stat_type = values.get("stat")
+                    if stat_type == "device_count":
+                        total_devices = int(values.get("_value") or 0)
+                    elif stat_type == "measurement_count":
+                        total_measurements = int(values.get("_value") or 0)
+                    elif stat_type == "first":
+                        first_measurement = values.get("_time")
+                    elif stat_type == "last":
+                        last_measurement = values.get("_time")
+
+            return total_devices, total_measurements, first_measurement, last_measurement
+
+        except Exception as e:
+            logger.error('Failed to get overall stats: %s', e)
             raise
 
     def health_check(self) -> Dict[str, Any]:
@@ -445,5 +620,12 @@ union(tables: [device_counts, measurement_counts, value_stats, time_range])
             }
 
 
-# Global InfluxDB service instance
-influxdb_service = InfluxDBService()
+@lru_cache(maxsize=None)
+def influxdb_service() -> InfluxDBService:
+    """
+    Global InfluxDB service instance, created on first use.
+
+    Importing this module does not build a client, so workers start without touching
+    the network and each worker process creates its own connection pool.
+    """
+    return InfluxDBService()
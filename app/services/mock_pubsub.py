@@ -1,8 +1,11 @@
-import json
+import itertools
 import time
 from datetime import datetime, UTC
-from typing import Dict, Any, List, Optional
-from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple, Union, Deque
+from collections import defaultdict, deque
+from functools import lru_cache
+
+import orjson
 
 from app.config import settings
 # from app.core.logging import LoggerMixin
@@ -21,9 +24,8 @@ class MockPubSubMessage:
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization"""
         try:
-            data_str = self.data.decode('utf-8')
-            data_json = json.loads(data_str)
-        except (UnicodeDecodeError, json.JSONDecodeError):
+            data_json = orjson.loads(self.data)
+        except orjson.JSONDecodeError:
             data_json = {"raw_data": self.data.hex()}
 
         return {
@@ -45,20 +47,36 @@ class MockPublisherClient:
 
     def __init__(self):
         self.project_id = settings.gcp_project_id or "mock-project"
-        self.published_messages: Dict[str, List[MockPubSubMessage]] = defaultdict(list)
         self.message_counter = 0
+        # Message IDs are a per-process prefix plus a counter; next() on
+        # itertools.count is atomic, so threaded publishers never share an ID
+        self._id_prefix = f"mock-msg-{int(time.time())}-"
+        self._message_ids = itertools.count(1)
+        # Topic path -> topic name, filled on first publish to each topic
+        self._topic_names: Dict[str, str] = {}
         self.max_messages_per_topic = 1000  # Prevent memory overflow
+        # Bounded per topic: appending past the limit drops the oldest message in O(1)
+        self.published_messages: Dict[str, Deque[MockPubSubMessage]] = defaultdict(
+            lambda: deque(maxlen=self.max_messages_per_topic)
+        )
 
         print("Mock Pub/Sub Publisher Client initialized", self.project_id, 'max_messages_per_topic:', self.max_messages_per_topic)
 
+    def _topic_name(self, topic_path: str) -> str:
+        """Extract topic name from path (parsed once per topic)"""
+        topic_name = self._topic_names.get(topic_path)
+        if topic_name is None:
+            topic_name = self._topic_names[topic_path] = topic_path.split('/')[-1]
+        return topic_name
+
     def publish(self, topic_path: str, data: bytes, **kwargs) -> 'MockFuture':
         """Mock publish method"""
-        # Extract topic name from path
-        topic_name = topic_path.split('/')[-1]
+        topic_name = self._topic_name(topic_path)
 
         # Generate unique message ID
-        self.message_counter += 1
-        message_id = f"mock-msg-{int(time.time())}-{self.message_counter}"
+        number = next(self._message_ids)
+        self.message_counter = number
+        message_id = self._id_prefix + str(number)
 
         # Create mock message
         message = MockPubSubMessage(
@@ -68,36 +86,31 @@ class MockPublisherClient:
             timestamp=datetime.now(UTC)
         )
 
-        # Store message (with size limit per topic)
-        if len(self.published_messages[topic_name]) >= self.max_messages_per_topic:
-            # Remove oldest message
-            self.published_messages[topic_name].pop(0)
-
+        # Store message (oldest dropped once the per-topic limit is reached)
         self.published_messages[topic_name].append(message)
 
-        # Log the published message
-        try:
-            data_dict = json.loads(data.decode('utf-8'))
-            # self.logger.info(
-            #     "Mock Pub/Sub message published",
-            #     message_id=message_id,
-            #     topic=topic_name,
-            #     device_id=data_dict.get('device_id'),
-            #     sensor_type=data_dict.get('sensor_type'),
-            #     value=data_dict.get('value')
-            # )
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            pass
-            # self.logger.info(
-            #     "Mock Pub/Sub message published (binary data)",
-            #     message_id=message_id,
-            #     topic=topic_name,
-            #     data_size=len(data)
-            # )
-
         # Return mock future
         return MockFuture(message_id)
 
+    def publish_many(self, topic_path: str, payloads: List[bytes]) -> List[str]:
+        """Mock publish of several messages to one topic; returns message IDs in order"""
+        topic_name = self._topic_name(topic_path)
+        timestamp = datetime.now(UTC)
+
+        message_ids = []
+        messages = []
+        for data in payloads:
+            number = next(self._message_ids)
+            message_id = self._id_prefix + str(number)
+            message_ids.append(message_id)
+            messages.append(MockPubSubMessage(message_id, topic_name, data, timestamp))
+
+        if payloads:
+            self.message_counter = number
+        self.published_messages[topic_name].extend(messages)
+
+        return message_ids
+
     def get_topic(self, request: Dict[str, str]) -> 'MockTopic':
         """Mock get_topic method for health checks"""
         topic_path = request.get("topic", "")
@@ -174,37 +187,46 @@ class MockPubSubService:
         self.topic_mapping = settings.sensor_topic_mapping
         self.client = MockPublisherClient()
 
-        # Mock circuit breaker (always closed)
-        self.circuit_breaker = MockCircuitBreaker()
+        # Topic paths are fixed for the process lifetime, so they are built once
+        self._topic_paths = {
+            sensor_type: topic_path(self.project_id, topic_name)
+            for sensor_type, topic_name in self.topic_mapping.items()
+        }
 
         print('Mock Pub/Sub Service initialized', self.project_id, self.topic_mapping)
 
     def get_topic_path(self, sensor_type: str) -> str:
         """Get full topic path for sensor type"""
-        topic_name = self.topic_mapping.get(sensor_type)
-        if not topic_name:
+        path = self._topic_paths.get(sensor_type)
+        if path is None:
             raise ValueError(f"No topic mapping found for sensor type: {sensor_type}")
 
-        return topic_path(self.project_id, topic_name)
-
-    def publish_sensor_data(self, sensor_type: str, data: Dict[str, Any]) -> str:
-        """Publish sensor data to mock Pub/Sub"""
-        topic_path = self.get_topic_path(sensor_type)
-        message_data = json.dumps(data, default=str).encode('utf-8')
-
-        # Use circuit breaker (mock always succeeds)
-        message_id = self.circuit_breaker.call(
-            self._publish_message,
-            topic_path,
-            message_data
-        )
-
-        return message_id
-
-    def _publish_message(self, topic_path: str, message_data: bytes) -> str:
-        """Internal method to publish message"""
-        future = self.client.publish(topic_path, message_data)
-        return future.result(timeout=settings.pubsub_timeout)
+        return path
+
+    def publish_sensor_data_batch(self, messages: List[Tuple[str, bytes]]) -> List[Union[str, Exception]]:
+        """
+        Publish a batch of encoded sensor data to mock Pub/Sub (message ID or exception per message).
+
+        Messages are grouped by sensor type so each topic gets a single client call;
+        every payload is still stored as its own message.
+        """
+        results: List[Union[str, Exception, None]] = [None] * len(messages)
+        positions_by_type: Dict[str, List[int]] = defaultdict(list)
+        for position, (sensor_type, _) in enumerate(messages):
+            positions_by_type[sensor_type].append(position)
+
+        for sensor_type, positions in positions_by_type.items():
+            try:
+                message_ids = self.client.publish_many(
+                    self.get_topic_path(sensor_type),
+                    [messages[position][1] for position in positions]
+                )
+            except Exception as e:
+                message_ids = [e] * len(positions)
+            for position, message_id in zip(positions, message_ids):
+                results[position] = message_id
+
+        return results
 
     def health_check(self) -> Dict[str, Any]:
         """Mock health check (always healthy)"""
@@ -231,22 +253,7 @@ class MockPubSubService:
         self.client.clear_messages(topic_name)
 
 
-class MockCircuitBreaker:
-    """Mock circuit breaker that always succeeds"""
-
-    def __init__(self):
-        self.state_name = "CLOSED"
-
-    def call(self, func, *args, **kwargs):
-        """Execute function (always succeeds in mock)"""
-        return func(*args, **kwargs)
-
-    @property
-    def state(self):
-        """Mock state object"""
-        return type('MockState', (), {'name': self.state_name})()
-
-
-# Global mock instances
-mock_pubsub_client = MockPublisherClient()
-mock_pubsub_service = MockPubSubService()
+@lru_cache(maxsize=None)
+def mock_pubsub_service() -> MockPubSubService:
+    """Global mock service instance (owns the mock client), created on first use"""
+    return MockPubSubService()
@@ -1,27 +1,66 @@
-import json
+import logging
+import os
+import threading
+import functools
 import time
-from typing import Dict, Any, Optional
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 from enum import Enum
 
 from app.config import settings
 
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-
 from google.api_core import exceptions as gcp_exceptions
+from google.api_core.retry import Retry, exponential_sleep_generator, if_exception_type
 
 
 
 # Conditional imports based on mock setting
 if settings.use_pubsub_mock or (settings.pubsub_mock_auto_enable and settings.debug):
     # Use mock Pub/Sub
-    from app.services.mock_pubsub import mock_pubsub_service as _pubsub_service_impl
+    from app.services.mock_pubsub import mock_pubsub_service
     USING_MOCK = True
 else:
     # Use real Pub/Sub (original implementation)
+    import grpc
     from google.cloud import pubsub_v1
     from google.cloud.pubsub_v1 import PublisherClient
+    from google.cloud.pubsub_v1.types import (
+        BatchSettings, PublisherOptions, PublishFlowControl, LimitExceededBehavior
+    )
+    from google.pubsub_v1.services.publisher.transports import PublisherGrpcTransport
     USING_MOCK = False
 
+    # Keepalive pings keep the HTTP/2 connection to Pub/Sub open between bursts, and
+    # detect a dead connection within the timeout instead of on the next publish
+    _GRPC_CHANNEL_OPTIONS = (
+        ("grpc.keepalive_time_ms", 30000),
+        ("grpc.keepalive_timeout_ms", 10000),
+    )
+    if settings.pubsub_enable_compression:
+        # Applies to whole publish requests, so the more messages a batch carries the
+        # better it compresses
+        _GRPC_CHANNEL_OPTIONS += (("grpc.default_compression_algorithm", int(grpc.Compression.Gzip)),)
+
+    class _PublisherGrpcTransport(PublisherGrpcTransport):
+        """Publisher gRPC transport with keepalive channel options"""
+
+        @classmethod
+        def create_channel(cls, *args, options=(), **kwargs):
+            overridden = {name for name, _ in _GRPC_CHANNEL_OPTIONS}
+            options = [option for option in options if option[0] not in overridden]
+            return super().create_channel(*args, options=[*options, *_GRPC_CHANNEL_OPTIONS], **kwargs)
+
+
+logger = logging.getLogger(__name__)
+
+# Publish errors worth retrying; any other error fails the message immediately
+_RETRYABLE_PUBLISH_ERRORS = (
+    gcp_exceptions.ServiceUnavailable,
+    gcp_exceptions.DeadlineExceeded,
+    gcp_exceptions.InternalServerError
+)
+
 
 class CircuitBreakerState(Enum):
     CLOSED = 0
@@ -30,7 +69,12 @@ class CircuitBreakerState(Enum):
 
 
 class CircuitBreaker:
-    """Circuit breaker implementation for Pub/Sub operations"""
+    """
+    Circuit breaker implementation for Pub/Sub operations.
+
+    Thread-safe: state transitions happen under a lock, while a closed breaker with
+    no recorded failures admits calls and records successes without taking it.
+    """
 
     def __init__(self, failure_threshold: int = 5, recovery_timeout: int = 60):
         self.failure_threshold = failure_threshold
@@ -38,14 +82,11 @@ class CircuitBreaker:
         self.failure_count = 0
         self.last_failure_time = None
         self.state = CircuitBreakerState.CLOSED
+        self._lock = threading.Lock()
 
     def call(self, func, *args, **kwargs):
         """Execute function with circuit breaker protection"""
-        if self.state == CircuitBreakerState.OPEN:
-            if self._should_attempt_reset():
-                self.state = CircuitBreakerState.HALF_OPEN
-            else:
-                raise Exception("Circuit breaker is OPEN")
+        self._before_call()
 
         try:
             result = func(*args, **kwargs)
@@ -55,25 +96,197 @@ class CircuitBreaker:
             self._on_failure()
             raise e
 
+    def call_future(self, func, *args, **kwargs) -> Future:
+        """Start operation returning a future; its outcome is recorded when it completes"""
+        self._before_call()
+
+        try:
+            future = func(*args, **kwargs)
+        except Exception:
+            self._on_failure()
+            raise
+
+        future.add_done_callback(self._record_outcome)
+        return future
+
+    def _record_outcome(self, done: Future):
+        """Record a finished call_future operation; a cancelled one says nothing about the backend"""
+        if done.cancelled():
+            return
+        if done.exception() is not None:
+            self._on_failure()
+        else:
+            self._on_success()
+
+    def _before_call(self):
+        """Reject calls while open, unless the recovery timeout allows a trial call"""
+        if self.state is CircuitBreakerState.CLOSED:
+            return
+
+        with self._lock:
+            if self.state is CircuitBreakerState.OPEN:
+                if self._should_attempt_reset():
+                    self.state = CircuitBreakerState.HALF_OPEN
+                else:
+                    raise Exception("Circuit breaker is OPEN")
+
     def _should_attempt_reset(self) -> bool:
         """Check if enough time has passed to attempt reset"""
         return (
             self.last_failure_time is not None and
-            time.time() - self.last_failure_time >= self.recovery_timeout
+            time.monotonic() - self.last_failure_time >= self.recovery_timeout
         )
 
     def _on_success(self):
         """Handle successful operation"""
-        self.failure_count = 0
-        self.state = CircuitBreakerState.CLOSED
+        if self.failure_count == 0 and self.state is CircuitBreakerState.CLOSED:
+            return
+
+        with self._lock:
+            self.failure_count = 0
+            self.state = CircuitBreakerState.CLOSED
 
     def _on_failure(self):
         """Handle failed operation"""
-        self.failure_count += 1
-        self.last_failure_time = time.time()
+        with self._lock:
+            self.failure_count += 1
+            # Monotonic, so wall-clock adjustments cannot shorten or extend recovery
+            self.last_failure_time = time.monotonic()
+
+            if self.failure_count >= self.failure_threshold:
+                self.state = CircuitBreakerState.OPEN
+
+class BulkheadFullError(Exception):
+    """Raised when no publish slot frees up within the bulkhead timeout"""
+
+
+class Bulkhead:
+    """
+    Caps concurrent in-flight operations.
+
+    Callers wait up to `acquire_timeout` seconds for a slot and then fail fast, so a
+    latency spike sheds load instead of piling up waiting publishers.
+    """
+
+    def __init__(self, max_in_flight: int, acquire_timeout: float):
+        self.max_in_flight = max_in_flight
+        self.acquire_timeout = acquire_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a slot or raise BulkheadFullError"""
+        with self._lock:
+            self.waiting += 1
+        acquired = self._slots.acquire(timeout=self.acquire_timeout)
+        with self._lock:
+            self.waiting -= 1
+            if acquired:
+                self.in_flight += 1
+
+        if not acquired:
+            raise BulkheadFullError(f"Too many in-flight publishes (limit {self.max_in_flight})")
+
+    def release(self):
+        """Return a slot taken by acquire()"""
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of successful calls.
+
+    Every success deposits `ratio` tokens (up to `burst`) and every retry spends one,
+    so transient blips are still retried but a failing backend is not hit with
+    several attempts per incoming request.
+    """
+
+    def __init__(self, ratio: float, burst: int):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = float(burst)
+        self.successes = 0
+        self.retries = 0
+        self.retries_denied = 0
+        self._lock = threading.Lock()
+
+    def record_success(self):
+        """Earn retry tokens for a successful call"""
+        with self._lock:
+            self.successes += 1
+            self.tokens = min(float(self.burst), self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take one token for a retry; False when the budget is exhausted"""
+        with self._lock:
+            if self.tokens < 1:
+                self.retries_denied += 1
+                return False
+            self.tokens -= 1
+            self.retries += 1
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Budget state for health checks"""
+        return {
+            "tokens": round(self.tokens, 2),
+            "successes": self.successes,
+            "retries": self.retries,
+            "retries_denied": self.retries_denied,
+            "retry_ratio": round(self.retries / self.successes, 4) if self.successes else None
+        }
+
+
+class PublishRetry(Retry):
+    """
+    Retry policy with an attempt cap and a retry budget on top of Retry's deadline.
+
+    Sleeps follow Retry's full-jitter backoff. A retry that would overrun the
+    deadline or the attempt cap, or that the budget denies, is not made; the last
+    error is raised instead. The budget is only charged for retries actually made.
+    """
+
+    def __init__(self, *args, max_attempts: int = 3, budget: Optional[RetryBudget] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_attempts = max_attempts
+        self.budget = budget
+
+    def __call__(self, func, on_error=None):
+        on_error = self._on_error or on_error
+
+        @functools.wraps(func)
+        def retry_wrapped_func(*args, **kwargs):
+            deadline = None if self._timeout is None else time.monotonic() + self._timeout
+            sleeps = exponential_sleep_generator(self._initial, self._maximum, self._multiplier)
+            attempt = 1
+            while True:
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    if attempt >= self.max_attempts or not self._predicate(e):
+                        raise
+                    sleep = next(sleeps)
+                    if deadline is not None and time.monotonic() + sleep > deadline:
+                        raise
+                    if self.budget is not None and not self.budget.try_spend():
+                        raise
+                    if on_error is not None:
+                        on_error(e)
+                    time.sleep(sleep)
+                    attempt += 1
+
+        return retry_wrapped_func
+
+    def with_timeout(self, timeout):
+        retry = super().with_timeout(timeout)
+        retry.max_attempts = self.max_attempts
+        retry.budget = self.budget
+        return retry
 
-        if self.failure_count >= self.failure_threshold:
-            self.state = CircuitBreakerState.OPEN
 
 # class PubSubService(LoggerMixin):
 class PubSubService:
@@ -91,6 +304,25 @@ class PubSubService:
                 failure_threshold=settings.circuit_breaker_failure_threshold,
                 recovery_timeout=settings.circuit_breaker_recovery_timeout
             )
+            self.bulkhead = Bulkhead(settings.pubsub_max_in_flight, settings.pubsub_bulkhead_timeout)
+            self.retry_budget = RetryBudget(
+                settings.pubsub_retry_budget_ratio, settings.pubsub_retry_budget_burst
+            )
+            # Retry policy the client applies to every publish, batched or single.
+            # Full-jitter backoff spreads out retries from many instances after a shared
+            # outage; attempts are capped and the deadline bounds tail latency
+            self._publish_retry = PublishRetry(
+                predicate=if_exception_type(*_RETRYABLE_PUBLISH_ERRORS),
+                initial=settings.pubsub_retry_delay,
+                maximum=10.0,
+                multiplier=2.0,
+                timeout=settings.pubsub_timeout,
+                max_attempts=settings.pubsub_retry_attempts,
+                budget=self.retry_budget,
+                on_error=lambda e: logger.warning('Retrying Pub/Sub publish after %s', e)
+            )
+            # Monotonic time of the last successful GetTopic health probe
+            self._last_topic_probe = float('-inf')
 
         self._initialize_client()
 
@@ -99,116 +331,158 @@ class PubSubService:
         try:
             if self.using_mock:
                 # Use mock service directly
-                self._mock_service = _pubsub_service_impl
-                print('Mock Pub/Sub client initialized successfully')
+                self._mock_service = mock_pubsub_service()
+                self._topic_paths = {
+                    sensor_type: self._mock_service.get_topic_path(sensor_type)
+                    for sensor_type in self.topic_mapping
+                }
+                logger.info('Mock Pub/Sub client initialized successfully')
             else:
                 # Initialize real Google Cloud Pub/Sub client
-                import os
-
                 # Set credentials path only if file exists (for local development)
-                if (settings.gcp_credentials_path and
-                    os.path.exists(settings.gcp_credentials_path)):
-                    os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = settings.gcp_credentials_path
-                    print(f'Using service account file: {settings.gcp_credentials_path}')
+                if settings.gcp_credentials_file:
+                    os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = settings.gcp_credentials_file
+                    logger.info('Using service account file: %s', settings.gcp_credentials_file)
                 else:
                     # Use Application Default Credentials (Cloud Run, gcloud auth, etc.)
-                    print('Using Application Default Credentials')
-
-                self.client = pubsub_v1.PublisherClient()
-                print('Real Pub/Sub client initialized successfully')
+                    logger.info('Using Application Default Credentials')
+
+                # publish() returns immediately and the client coalesces messages into
+                # batches; flow control blocks publishers instead of buffering without bound.
+                # Batches are kept per topic, each committed independently over the shared
+                # channel, so one client serves all sensor topics without head-of-line blocking
+                self.client = pubsub_v1.PublisherClient(
+                    transport=_PublisherGrpcTransport,
+                    batch_settings=BatchSettings(
+                        max_messages=settings.pubsub_batch_max_messages,
+                        max_bytes=settings.pubsub_batch_max_bytes,
+                        max_latency=settings.pubsub_batch_max_latency
+                    ),
+                    publisher_options=PublisherOptions(
+                        flow_control=PublishFlowControl(
+                            message_limit=settings.pubsub_flow_control_max_messages,
+                            byte_limit=settings.pubsub_flow_control_max_bytes,
+                            limit_exceeded_behavior=LimitExceededBehavior.BLOCK
+                        )
+                    )
+                )
+                # Topic paths are fixed for the process lifetime, so they are built once
+                self._topic_paths = {
+                    sensor_type: self.client.topic_path(self.project_id, topic_name)
+                    for sensor_type, topic_name in self.topic_mapping.items()
+                }
+                # Reverse map for log messages
+                self._topic_names = {
+                    self._topic_paths[sensor_type]: topic_name
+                    for sensor_type, topic_name in self.topic_mapping.items()
+                }
+                logger.info('Real Pub/Sub client initialized successfully')
 
         except Exception as e:
-            print(f'Error initializing Pub/Sub client: {e}')
+            logger.error('Error initializing Pub/Sub client: %s', e)
             raise
 
+    def warm_up(self) -> None:
+        """Open the gRPC channel and check every topic before serving (real Pub/Sub only)"""
+        if self.using_mock:
+            return
+
+        # Runs before the worker heartbeats, so each call is bounded and never retried
+        for topic_path in self._topic_paths.values():
+            try:
+                self._probe_topic(topic_path)
+            except Exception as e:
+                logger.warning('Pub/Sub warm-up failed for topic %s: %s', topic_path, e)
+
+    def _probe_topic(self, topic_path: str) -> None:
+        """GetTopic with a short timeout and no retry; raises if Pub/Sub is unreachable"""
+        self.client.get_topic(
+            request={"topic": topic_path}, retry=None, timeout=settings.pubsub_probe_timeout
+        )
+
     def get_topic_path(self, sensor_type: str) -> str:
         """Get full topic path for sensor type"""
-        topic_name = self.topic_mapping.get(sensor_type)
-        if not topic_name:
+        path = self._topic_paths.get(sensor_type)
+        if path is None:
             raise ValueError(f"No topic mapping found for sensor type: {sensor_type}")
 
-        if self.using_mock:
-            return self._mock_service.get_topic_path(sensor_type)
-        else:
-            return self.client.topic_path(self.project_id, topic_name)
+        return path
 
-    def publish_sensor_data(self, sensor_type: str, data: Dict[str, Any]) -> str:
-        """Publish sensor data to appropriate Pub/Sub topic"""
+    def publish_payload(self, sensor_type: str, payload: bytes) -> Future:
+        """
+        Hand encoded sensor data to the publisher without waiting for the result.
+
+        The payload is JSON already encoded in the cloud Avro schema format. Returns
+        a future resolving to the message ID; the client sends it with other pending
+        messages per its batch settings.
+        """
         if self.using_mock:
-            # Use mock service
-            return self._mock_service.publish_sensor_data(sensor_type, data)
+            return self.publish_payload_batch([(sensor_type, payload)])[0]
 
-        # Use real Pub/Sub service
-        topic_path = self.get_topic_path(sensor_type)
+        return self._start_publish(self.get_topic_path(sensor_type), payload)
 
-        # Transform data to match Avro schema in cloud
-        transformed_data = self._transform_data_for_avro_schema(data)
-        message_data = json.dumps(transformed_data, default=str).encode('utf-8')
+    def _start_publish(self, topic_path: str, message_data: bytes) -> Future:
+        """
+        Hand one message to the client under bulkhead and circuit breaker (real Pub/Sub only).
 
+        Used by the batched request path, so each successful publish here funds the
+        retry budget.
+        """
+        self.bulkhead.acquire()
         try:
-            message_id = self.circuit_breaker.call(
-                self._publish_message,
-                topic_path,
-                message_data
+            future = self.circuit_breaker.call_future(
+                self.client.publish, topic_path, message_data, retry=self._publish_retry
             )
-
-            return message_id
-
-        except Exception as e:
-            print('Error publishing message to Pub/Sub:', e)
+        except Exception:
+            self.bulkhead.release()
             raise
 
-    def _transform_data_for_avro_schema(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Transform SensorGate data format to match cloud Avro schema"""
-        # New schema expects string timestamp, not microseconds
-        timestamp_value = data.get('timestamp')
-        if isinstance(timestamp_value, str):
-            # Keep as ISO string format as expected by schema
-            timestamp_str = timestamp_value
-        else:
-            # Convert to ISO string if it's not already
-            from datetime import datetime
-            timestamp_str = datetime.utcnow().isoformat() + "Z"
-
-        return {
-            "device_id": int(data.get('device_id', 0)),
-            "sensor_type": data.get('sensor_type', ''),
-            "value": float(data.get('value', 0.0)),
-            "latitude": float(data.get('latitude', 0.0)),
-            "longitude": float(data.get('longitude', 0.0)),
-            "timestamp": timestamp_str
-        }
-
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        retry=retry_if_exception_type((
-            gcp_exceptions.ServiceUnavailable,
-            gcp_exceptions.DeadlineExceeded,
-            gcp_exceptions.InternalServerError
-        ))
-    )
-    def _publish_message(self, topic_path: str, message_data: bytes) -> str:
-        """Internal method to publish message with retry logic (real Pub/Sub only)"""
+        def on_done(done: Future) -> None:
+            self.bulkhead.release()
+            if done.cancelled():
+                return
+            error = done.exception()
+            if error is None:
+                self.retry_budget.record_success()
+            else:
+                logger.error(
+                    'Pub/Sub publish failed topic=%s type=%s: %s',
+                    self._topic_names.get(topic_path, topic_path), type(error).__name__, error
+                )
+
+        future.add_done_callback(on_done)
+        return future
+
+    def publish_payload_batch(self, messages: List[Tuple[str, bytes]]) -> List[Future]:
+        """
+        Hand a batch of (sensor_type, payload) messages to the publisher.
+
+        Returns one future per message, in order; a message that could not be handed
+        over gets a future holding its exception. May block on publish flow control,
+        so call it from a worker thread.
+        """
         if self.using_mock:
-            # This method shouldn't be called for mock, but handle gracefully
-            return "mock-message-id"
-
-        start_time = time.time()
-
-        try:
-            future = self.client.publish(topic_path, message_data)
-            message_id = future.result(timeout=settings.pubsub_timeout)
-
-            duration = time.time() - start_time
-            topic_name = topic_path.split('/')[-1]
-
-
-            return message_id
-        except Exception as e:
-            topic_name = topic_path.split('/')[-1]
-            error_type = type(e).__name__
-            raise
+            futures = []
+            for result in self._mock_service.publish_sensor_data_batch(messages):
+                future: Future = Future()
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+                futures.append(future)
+            return futures
+
+        futures = []
+        for sensor_type, payload in messages:
+            try:
+                futures.append(self.publish_payload(sensor_type, payload))
+            except Exception as e:
+                logger.error('Error publishing message to Pub/Sub: %s', e)
+                future = Future()
+                future.set_exception(e)
+                futures.append(future)
+
+        return futures
 
     def health_check(self) -> Dict[str, Any]:
         """Check Pub/Sub service health"""
@@ -220,17 +494,26 @@ class PubSubService:
 
         # Real Pub/Sub health check
         try:
-            # Try to get topic info as a health check
-            sample_topic = list(self.topic_mapping.values())[0]
-            topic_path = self.client.topic_path(self.project_id, sample_topic)
+            # A recent successful probe is trusted until it expires or a publish fails
+            probe_fresh = (
+                self.circuit_breaker.failure_count == 0 and
+                time.monotonic() - self._last_topic_probe < settings.pubsub_health_probe_ttl
+            )
+            if not probe_fresh:
+                # Try to get topic info as a health check
+                topic_path = next(iter(self._topic_paths.values()))
 
-            # This will raise an exception if the topic doesn't exist or there are connection issues
-            self.client.get_topic(request={"topic": topic_path})
+                # This will raise an exception if the topic doesn't exist or there are connection issues
+                self._probe_topic(topic_path)
+                self._last_topic_probe = time.monotonic()
 
             return {
                 "status": "healthy",
                 "using_mock": False,
                 "circuit_breaker_state": self.circuit_breaker.state.name,
+                "in_flight": self.bulkhead.in_flight,
+                "queue_depth": self.bulkhead.waiting,
+                "retry_budget": self.retry_budget.stats(),
                 "project_id": self.project_id,
                 "available_topics": list(self.topic_mapping.values())
             }
@@ -256,5 +539,12 @@ class PubSubService:
         return False
 
 
-# Global PubSub service instance
-pubsub_service = PubSubService()
+@lru_cache(maxsize=None)
+def pubsub_service() -> PubSubService:
+    """
+    Global PubSub service instance, created on first use.
+
+    Importing this module does not create a publisher client, so it works without
+    credentials and each worker process builds its own gRPC channel.
+    """
+    return PubSubService()
@@ -0,0 +1,16 @@
+import time
+
+# (epoch second, ISO string) of the last formatted timestamp; swapped as one tuple so
+# concurrent callers never see a mismatched pair
+_utc_now_cache = (0, "")
+
+
+def utc_now_iso() -> str:
+    """Current UTC time as ISO 8601 string (second precision, `Z` suffix), formatted once per second"""
+    global _utc_now_cache
+    second = int(time.time())
+    cached_second, cached_str = _utc_now_cache
+    if second != cached_second:
+        cached_str = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(second))
+        _utc_now_cache = (second, cached_str)
+    return cached_str
@@ -0,0 +1,21 @@
+"""Gunicorn configuration for production deployment
+
+Runs one Uvicorn worker process per CPU core. Each worker has its own event loop
+(uvloop), Pub/Sub client and publish batcher, so ingestion scales with cores
+instead of being bound to a single GIL.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+
+# WEB_CONCURRENCY overrides the worker count (e.g. when CPU is limited by cgroups)
+workers = int(os.environ.get("WEB_CONCURRENCY", max(2, multiprocessing.cpu_count())))
+
+# Picks uvloop and httptools automatically when installed
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# InfluxDB queries may take up to the client timeout (30s) before failing
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
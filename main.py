@@ -3,10 +3,13 @@ from app.main import app
 if __name__ == "__main__":
     import uvicorn
     from app.config import settings
+    # Auto-reload only in debug mode, where it replaces multiple workers. uvloop and
+    # httptools are picked automatically when installed
     uvicorn.run(
         "app.main:app",
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        workers=1 if settings.debug else settings.workers,
         log_level=settings.log_level.lower()
     )
@@ -0,0 +1,51 @@
+import os
+
+os.environ.setdefault("SENSORGATE_HOST", "127.0.0.1")
+os.environ.setdefault("SENSORGATE_PORT", "8000")
+os.environ.setdefault("SENSORGATE_DEBUG", "true")
+os.environ.setdefault("SENSORGATE_GCP_PROJECT_ID", "test-project")
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import settings
+from app.services.auth import AuthService
+
+
+def _auth_service(monkeypatch, api_keys, public_access_enabled=False):
+    monkeypatch.setattr(settings, "api_keys", api_keys)
+    monkeypatch.setattr(settings, "public_access_enabled", public_access_enabled)
+    return AuthService()
+
+
+def test_valid_key_is_accepted(monkeypatch):
+    auth = _auth_service(monkeypatch, ["key-1", "key-2"])
+    assert not auth.allow_all
+    assert auth.authenticate_request("key-2")
+
+
+@pytest.mark.parametrize("api_key, detail", [
+    (None, "Missing API key. Provide X-API-Key header."),
+    ("", "Missing API key. Provide X-API-Key header."),
+    ("wrong-key", "Invalid API key"),
+])
+def test_missing_or_invalid_key_is_rejected(monkeypatch, api_key, detail):
+    auth = _auth_service(monkeypatch, ["key-1"])
+    with pytest.raises(HTTPException) as error:
+        auth.authenticate_request(api_key)
+    assert error.value.status_code == 401
+    assert error.value.detail == detail
+    assert error.value.headers == {"WWW-Authenticate": "ApiKey"}
+
+
+def test_public_access_allows_any_request(monkeypatch):
+    auth = _auth_service(monkeypatch, ["key-1"], public_access_enabled=True)
+    assert auth.allow_all
+    assert auth.authenticate_request(None)
+    assert auth.authenticate_request("wrong-key")
+
+
+def test_no_configured_keys_allows_any_request(monkeypatch):
+    auth = _auth_service(monkeypatch, [])
+    assert auth.allow_all
+    assert auth.authenticate_request(None)
@@ -0,0 +1,84 @@
+import asyncio
+import os
+from datetime import datetime, UTC
+
+os.environ.setdefault("SENSORGATE_HOST", "127.0.0.1")
+os.environ.setdefault("SENSORGATE_PORT", "8000")
+os.environ.setdefault("SENSORGATE_DEBUG", "true")
+os.environ.setdefault("SENSORGATE_GCP_PROJECT_ID", "test-project")
+
+import pytest
+
+from app.models.history import AggregationType, HistoryQueryParams
+from app.models.sensor import SensorType
+from app.services.influxdb import InfluxDBService
+
+# Flux transformations that are never pushed down to storage. A filter() after one of
+# these runs in the query engine over every row read instead of in storage
+_NON_PUSHDOWN_OPS = ("keep(", "drop(", "pivot(", "sort(", "map(", "reduce(", "toFloat(", "limit(")
+
+_PARAMS = HistoryQueryParams(
+    start_time=datetime(2024, 1, 1, tzinfo=UTC),
+    end_time=datetime(2024, 1, 2, tzinfo=UTC),
+    sensor_type=SensorType.TEMPERATURE,
+    device_id=7,
+    sensor_types=[SensorType.TEMPERATURE, SensorType.HUMIDITY],
+    device_ids=[7, 8],
+    latitude_min=10.0,
+    latitude_max=20.0,
+    longitude_min=30.0,
+    longitude_max=40.0,
+)
+
+
+class CapturingQueryApi:
+    """Records page queries and answers them with an empty result"""
+
+    def __init__(self):
+        self.queries = []
+
+    def query_csv(self, query, org=None, dialect=None):
+        self.queries.append(query)
+        return iter([])
+
+
+def _service():
+    service = InfluxDBService.__new__(InfluxDBService)
+    service.bucket = "sensor_data"
+    service.org = "test"
+    service.query_api = CapturingQueryApi()
+    return service
+
+
+def _assert_filters_pushed_down(query):
+    """Fail when a filter() follows a transformation that stops storage pushdown"""
+    blocking_op = None
+    for line in query.splitlines():
+        op = line.strip().removeprefix("|> ")
+        assert not (op.startswith("filter(") and blocking_op), f"filter() after {blocking_op}() in:\n{query}"
+        if op.startswith(_NON_PUSHDOWN_OPS):
+            blocking_op = op[:op.index("(")]
+
+
+def test_base_query_filters_are_pushed_down():
+    query = _service()._build_base_query(_PARAMS)
+    assert query.count("filter(") == 9
+    _assert_filters_pushed_down(query)
+
+
+@pytest.mark.parametrize("aggregation", list(AggregationType))
+def test_aggregation_query_filters_are_pushed_down(aggregation):
+    service = _service()
+    query = service._build_aggregation_query(service._build_base_query(_PARAMS), aggregation)
+    assert 'r["_field"] == "value"' in query
+    _assert_filters_pushed_down(query)
+
+
+def test_page_query_cursor_filter_is_pushed_down():
+    service = _service()
+    asyncio.run(service.query_historical_page(
+        _PARAMS, limit=10, after=("2024-01-01T00:00:00.000000001Z", "7", "temperature")
+    ))
+    (query,) = service.query_api.queries
+    assert 'time(v: "2024-01-01T00:00:00.000000001Z")' in query
+    _assert_filters_pushed_down(query)
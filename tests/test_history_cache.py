@@ -0,0 +1,118 @@
+import asyncio
+import os
+from datetime import datetime, UTC
+
+os.environ.setdefault("SENSORGATE_HOST", "127.0.0.1")
+os.environ.setdefault("SENSORGATE_PORT", "8000")
+os.environ.setdefault("SENSORGATE_DEBUG", "true")
+os.environ.setdefault("SENSORGATE_GCP_PROJECT_ID", "test-project")
+
+from fastapi.testclient import TestClient
+
+from app.api import history
+from app.api.deps import get_influxdb_service
+from app.main import app
+from app.models.history import HistoricalDataPoint
+from app.models.sensor import SensorType
+from app.services.cache import response_cache
+
+
+class FakeInfluxDB:
+    """Returns one history page and counts the queries it answered"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def query_historical_page(self, params, limit, after=None):
+        self.calls += 1
+        point = HistoricalDataPoint(
+            timestamp=datetime(2024, 1, 1, tzinfo=UTC), device_id=1,
+            sensor_type=SensorType.TEMPERATURE, value=21.5, latitude=50.0, longitude=30.0
+        )
+        return [point], None
+
+
+def _get_history(client, start_time, headers=None):
+    return client.get("/api/v1/sensors/history", headers=headers, params={
+        "start_time": start_time,
+        "end_time": "2024-01-02T00:00:00Z",
+    })
+
+
+def test_etag_revalidation_answers_304_from_cache():
+    service = FakeInfluxDB()
+    app.dependency_overrides[get_influxdb_service] = lambda: service
+    client = TestClient(app)
+
+    first = _get_history(client, "2024-01-01T00:00:01Z")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert first.headers["cache-control"].startswith("private, max-age=")
+
+    revalidated = _get_history(client, "2024-01-01T00:00:01Z", headers={"If-None-Match": etag})
+    stale = _get_history(client, "2024-01-01T00:00:01Z", headers={"If-None-Match": '"outdated"'})
+    app.dependency_overrides.clear()
+
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert stale.status_code == 200
+    assert stale.content == first.content
+    # Both repeats were answered from the response cache
+    assert service.calls == 1
+
+
+def test_different_queries_are_cached_separately():
+    service = FakeInfluxDB()
+    app.dependency_overrides[get_influxdb_service] = lambda: service
+    client = TestClient(app)
+
+    _get_history(client, "2024-01-01T00:00:02Z")
+    _get_history(client, "2024-01-01T00:00:03Z")
+    app.dependency_overrides.clear()
+
+    assert service.calls == 2
+
+
+def test_run_once_shares_one_query_between_concurrent_callers():
+    calls = []
+
+    async def query():
+        calls.append(None)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def run():
+        results = await asyncio.gather(*(history._run_once("key", query) for _ in range(5)))
+        # Finished queries are forgotten, so a later caller runs a fresh one
+        return results, await history._run_once("key", query)
+
+    results, later = asyncio.run(run())
+    assert results == [1] * 5
+    assert later == 2
+    assert history._inflight == {}
+
+
+def test_run_once_query_survives_a_cancelled_caller():
+    async def run():
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def query():
+            started.set()
+            await release.wait()
+            return "result"
+
+        first = asyncio.ensure_future(history._run_once("key", query))
+        await started.wait()
+        second = asyncio.ensure_future(history._run_once("key", query))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        return await second, first.cancelled()
+
+    assert asyncio.run(run()) == ("result", True)
+
+
+def teardown_module():
+    asyncio.run(response_cache.backend.close())
@@ -0,0 +1,88 @@
+import os
+import re
+
+os.environ.setdefault("SENSORGATE_HOST", "127.0.0.1")
+os.environ.setdefault("SENSORGATE_PORT", "8000")
+os.environ.setdefault("SENSORGATE_DEBUG", "true")
+os.environ.setdefault("SENSORGATE_GCP_PROJECT_ID", "test-project")
+
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_influxdb_service
+from app.main import app
+from app.services.influxdb import InfluxDBService
+
+_HEADER = ["", "result", "table", "_time", "device_id", "sensor_type", "value", "latitude", "longitude"]
+
+# Two sensor types share the first (_time, device_id); the times differ only in nanoseconds
+_ROWS = sorted([
+    ("2024-01-01T00:00:00.000000001Z", "1", "temperature"),
+    ("2024-01-01T00:00:00.000000001Z", "1", "humidity"),
+    ("2024-01-01T00:00:00.000000001Z", "2", "temperature"),
+    ("2024-01-01T00:00:00.000000002Z", "1", "ndir"),
+])
+
+
+class FakeQueryApi:
+    """Answers paginated history queries from _ROWS, applying the query's cursor and limit"""
+
+    def __init__(self):
+        self.queries = []
+
+    def query_csv(self, query, org=None, dialect=None):
+        self.queries.append(query)
+        after = re.search(
+            r'time\(v: "([^"]+)"\).*r\.device_id > "(\d+)".*r\.sensor_type > "(\w+)"', query
+        )
+        limit = int(re.search(r"limit\(n: (\d+)\)", query).group(1))
+        rows = [row for row in _ROWS if after is None or row > after.groups()]
+        return iter([_HEADER] + [
+            ["", "_result", "0", *row, "1.0", "50.0", "30.0"] for row in rows[:limit]
+        ])
+
+
+def _client():
+    service = InfluxDBService.__new__(InfluxDBService)
+    service.bucket = "sensor_data"
+    service.org = "test"
+    service.query_api = FakeQueryApi()
+    app.dependency_overrides[get_influxdb_service] = lambda: service
+    return TestClient(app), service.query_api
+
+
+def test_pages_split_points_sharing_time_and_device():
+    client, query_api = _client()
+    params = {
+        "start_time": "2024-01-01T00:00:00Z",
+        "end_time": "2024-01-02T00:00:00Z",
+        "limit": 1,
+    }
+
+    seen = []
+    cursor = None
+    for _ in range(len(_ROWS) + 1):
+        response = client.get(
+            "/api/v1/sensors/history", params=dict(params, **({"cursor": cursor} if cursor else {}))
+        )
+        assert response.status_code == 200
+        body = response.json()
+        seen += [(point["device_id"], point["sensor_type"]) for point in body["data"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    app.dependency_overrides.clear()
+    assert seen == [(int(device_id), sensor_type) for _, device_id, sensor_type in _ROWS]
+    # The cursor carries InfluxDB's nanosecond _time, not a microsecond-truncated one
+    assert 'time(v: "2024-01-01T00:00:00.000000001Z")' in query_api.queries[1]
+
+
+def test_rejects_malformed_cursor():
+    client, _ = _client()
+    response = client.get("/api/v1/sensors/history", params={
+        "start_time": "2024-01-01T00:00:00Z",
+        "end_time": "2024-01-02T00:00:00Z",
+        "cursor": "WyIyMDI0IiwgIjEiLCAidGVtcGVyYXR1cmUiXQ==",
+    })
+    app.dependency_overrides.clear()
+    assert response.status_code == 422
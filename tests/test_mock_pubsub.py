@@ -0,0 +1,48 @@
+import os
+
+os.environ.setdefault("SENSORGATE_HOST", "127.0.0.1")
+os.environ.setdefault("SENSORGATE_PORT", "8000")
+os.environ.setdefault("SENSORGATE_DEBUG", "true")
+os.environ.setdefault("SENSORGATE_GCP_PROJECT_ID", "test-project")
+
+from app.config import settings
+from app.services.mock_pubsub import MockPubSubService
+
+
+def test_batch_makes_one_client_call_per_topic_and_keeps_message_order():
+    service = MockPubSubService()
+    calls = []
+    publish_many = service.client.publish_many
+
+    def counting_publish_many(topic_path, payloads):
+        calls.append((topic_path.split("/")[-1], payloads))
+        return publish_many(topic_path, payloads)
+
+    service.client.publish_many = counting_publish_many
+    messages = [("temperature", b"t1"), ("humidity", b"h1"), ("temperature", b"t2"), ("ndir", b"n1")]
+
+    results = service.publish_sensor_data_batch(messages)
+
+    topics = settings.sensor_topic_mapping
+    assert calls == [
+        (topics["temperature"], [b"t1", b"t2"]),
+        (topics["humidity"], [b"h1"]),
+        (topics["ndir"], [b"n1"]),
+    ]
+    # Results line up with the input messages, and every payload is stored separately
+    published = service.client.published_messages
+    stored = {
+        message.message_id: message.data for topic in published.values() for message in topic
+    }
+    assert [stored[message_id] for message_id in results] == [b"t1", b"h1", b"t2", b"n1"]
+    assert len(set(results)) == len(messages)
+
+
+def test_unknown_sensor_type_fails_only_its_messages():
+    service = MockPubSubService()
+
+    results = service.publish_sensor_data_batch([("temperature", b"t1"), ("pressure", b"p1")])
+
+    assert isinstance(results[0], str)
+    assert isinstance(results[1], ValueError)
+
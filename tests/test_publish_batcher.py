@@ -0,0 +1,134 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future
+
+os.environ.setdefault("SENSORGATE_HOST", "127.0.0.1")
+os.environ.setdefault("SENSORGATE_PORT", "8000")
+os.environ.setdefault("SENSORGATE_DEBUG", "true")
+os.environ.setdefault("SENSORGATE_GCP_PROJECT_ID", "test-project")
+
+import pytest
+
+from app.config import settings
+from app.services.batcher import PublishBatcher
+
+
+class FakePublisher:
+    """Resolves every message with an ID; batches can be held until released"""
+
+    def __init__(self, hold: bool = False):
+        self.batches = []
+        self.release = threading.Event()
+        if not hold:
+            self.release.set()
+
+    def publish_payload_batch(self, messages):
+        self.batches.append(messages)
+        self.release.wait(5)
+        futures = []
+        for sensor_type, payload in messages:
+            future = Future()
+            future.set_result(f"{sensor_type}:{payload.decode()}")
+            futures.append(future)
+        return futures
+
+
+def test_coalesces_concurrent_submits_into_one_batch():
+    publisher = FakePublisher()
+
+    async def run():
+        batcher = PublishBatcher(publisher, max_batch_size=10, max_latency=0.05)
+        batcher.start()
+        results = await asyncio.gather(*(batcher.submit("temperature", str(i).encode()) for i in range(3)))
+        await batcher.stop()
+        return results
+
+    assert asyncio.run(run()) == ["temperature:0", "temperature:1", "temperature:2"]
+    assert len(publisher.batches) == 1
+
+
+def test_blocked_batch_does_not_hold_up_the_next():
+    publisher = FakePublisher(hold=True)
+
+    async def run():
+        batcher = PublishBatcher(publisher, max_batch_size=1, max_latency=0.01)
+        batcher.start()
+        submits = [asyncio.ensure_future(batcher.submit("humidity", str(i).encode())) for i in range(2)]
+        for _ in range(100):
+            if len(publisher.batches) == 2:
+                break
+            await asyncio.sleep(0.01)
+        # Both batches reached the publisher while the first was still blocked
+        batches_in_flight = len(publisher.batches)
+        publisher.release.set()
+        results = await asyncio.gather(*submits)
+        await batcher.stop()
+        return batches_in_flight, results
+
+    batches_in_flight, results = asyncio.run(run())
+    assert batches_in_flight == 2
+    assert results == ["humidity:0", "humidity:1"]
+
+
+def test_stop_publishes_pending_messages():
+    publisher = FakePublisher()
+
+    async def run():
+        batcher = PublishBatcher(publisher, max_batch_size=10, max_latency=1)
+        batcher.start()
+        submit = asyncio.ensure_future(batcher.submit("ndir", b"1"))
+        await asyncio.sleep(0)
+        await batcher.stop()
+        return await submit
+
+    assert asyncio.run(run()) == "ndir:1"
+
+
+def test_publisher_error_fails_every_message_in_batch():
+    class FailingPublisher:
+        def publish_payload_batch(self, messages):
+            raise RuntimeError("Pub/Sub unavailable")
+
+    async def run():
+        batcher = PublishBatcher(FailingPublisher(), max_batch_size=10, max_latency=0.01)
+        batcher.start()
+        results = await asyncio.gather(
+            batcher.submit("temperature", b"1"), batcher.submit("humidity", b"2"), return_exceptions=True
+        )
+        await batcher.stop()
+        return results
+
+    assert [str(result) for result in asyncio.run(run())] == ["Pub/Sub unavailable"] * 2
+
+
+def test_submit_times_out_when_batcher_is_not_draining(monkeypatch):
+    monkeypatch.setattr(settings, "pubsub_timeout", 0.05)
+
+    async def run():
+        batcher = PublishBatcher(FakePublisher())
+        batcher._queue = asyncio.Queue()
+        await batcher.submit("temperature", b"1")
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
+
+
+def test_run_failure_fails_queued_messages():
+    async def run():
+        batcher = PublishBatcher(FakePublisher())
+        batcher._queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        pending = [loop.create_future() for _ in range(2)]
+        for future in pending:
+            batcher._queue.put_nowait(("temperature", b"1", future))
+
+        async def broken_get():
+            raise RuntimeError("queue broken")
+
+        batcher._queue.get = broken_get
+        with pytest.raises(RuntimeError):
+            await batcher._run()
+        return [str(future.exception()) for future in pending]
+
+    assert asyncio.run(run()) == ["queue broken"] * 2
@@ -0,0 +1,181 @@
+import os
+import threading
+from concurrent.futures import Future
+
+os.environ.setdefault("SENSORGATE_HOST", "127.0.0.1")
+os.environ.setdefault("SENSORGATE_PORT", "8000")
+os.environ.setdefault("SENSORGATE_DEBUG", "true")
+os.environ.setdefault("SENSORGATE_GCP_PROJECT_ID", "test-project")
+
+import pytest
+from google.api_core import exceptions as gcp_exceptions
+from google.api_core.retry import if_exception_type
+
+from app.services.pubsub import (
+    Bulkhead, BulkheadFullError, CircuitBreaker, CircuitBreakerState, PublishRetry, RetryBudget
+)
+
+
+def _failed(error):
+    future = Future()
+    future.set_exception(error)
+    return future
+
+
+def test_circuit_breaker_opens_after_threshold_and_rejects_calls():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+    for _ in range(2):
+        breaker.call_future(_failed, RuntimeError("publish failed"))
+
+    assert breaker.state is CircuitBreakerState.OPEN
+    with pytest.raises(Exception, match="OPEN"):
+        breaker.call_future(Future)
+
+
+def test_circuit_breaker_half_open_trial_success_closes():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+    breaker.call_future(_failed, RuntimeError("publish failed"))
+    assert breaker.state is CircuitBreakerState.OPEN
+
+    future = breaker.call_future(Future)
+    assert breaker.state is CircuitBreakerState.HALF_OPEN
+    future.set_result("message-id")
+    assert breaker.state is CircuitBreakerState.CLOSED
+    assert breaker.failure_count == 0
+
+
+def test_circuit_breaker_records_outcome_when_future_completes():
+    breaker = CircuitBreaker(failure_threshold=5)
+    future = breaker.call_future(Future)
+    assert breaker.failure_count == 0
+
+    future.set_exception(RuntimeError("publish failed"))
+    assert breaker.failure_count == 1
+
+
+def test_circuit_breaker_ignores_cancelled_future():
+    breaker = CircuitBreaker(failure_threshold=1)
+    future = breaker.call_future(Future)
+    future.cancel()
+
+    assert breaker.failure_count == 0
+    assert breaker.state is CircuitBreakerState.CLOSED
+
+
+def test_circuit_breaker_counts_call_that_raises():
+    breaker = CircuitBreaker(failure_threshold=5)
+
+    def start():
+        raise RuntimeError("publish rejected")
+
+    with pytest.raises(RuntimeError):
+        breaker.call_future(start)
+    assert breaker.failure_count == 1
+
+
+def test_bulkhead_fails_fast_when_full_and_frees_slot_on_release():
+    bulkhead = Bulkhead(max_in_flight=1, acquire_timeout=0.01)
+    bulkhead.acquire()
+    assert bulkhead.in_flight == 1
+
+    with pytest.raises(BulkheadFullError):
+        bulkhead.acquire()
+    assert bulkhead.waiting == 0
+
+    bulkhead.release()
+    bulkhead.acquire()
+    assert bulkhead.in_flight == 1
+
+
+def test_bulkhead_waiter_gets_slot_released_within_timeout():
+    bulkhead = Bulkhead(max_in_flight=1, acquire_timeout=5)
+    bulkhead.acquire()
+    threading.Timer(0.05, bulkhead.release).start()
+
+    bulkhead.acquire()
+    assert bulkhead.in_flight == 1
+
+
+def test_retry_budget_denies_retries_once_spent():
+    budget = RetryBudget(ratio=0.5, burst=2)
+    assert budget.try_spend()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+    budget.record_success()
+    assert not budget.try_spend()
+    budget.record_success()
+    assert budget.try_spend()
+
+    assert budget.stats() == {
+        "tokens": 0.0, "successes": 2, "retries": 3, "retries_denied": 2, "retry_ratio": 1.5
+    }
+
+
+def test_retry_budget_earns_at_most_burst_tokens():
+    budget = RetryBudget(ratio=1.0, burst=2)
+    for _ in range(5):
+        budget.record_success()
+    assert budget.tokens == 2.0
+
+
+def _flaky(failures, error=gcp_exceptions.ServiceUnavailable):
+    """Callable failing `failures` times before succeeding; counts its calls"""
+    calls = []
+
+    def func():
+        calls.append(None)
+        if len(calls) <= failures:
+            raise error("unavailable")
+        return "message-id"
+
+    return func, calls
+
+
+def _retry(budget=None, max_attempts=3, timeout=30.0):
+    return PublishRetry(
+        predicate=if_exception_type(gcp_exceptions.ServiceUnavailable),
+        initial=0.001, maximum=0.001, timeout=timeout, max_attempts=max_attempts, budget=budget
+    )
+
+
+def test_publish_retry_retries_transient_errors_up_to_attempt_cap():
+    func, calls = _flaky(failures=1)
+    assert _retry()(func)() == "message-id"
+    assert len(calls) == 2
+
+    func, calls = _flaky(failures=5)
+    with pytest.raises(gcp_exceptions.ServiceUnavailable):
+        _retry(max_attempts=3)(func)()
+    assert len(calls) == 3
+
+
+def test_publish_retry_does_not_retry_other_errors():
+    func, calls = _flaky(failures=1, error=gcp_exceptions.InvalidArgument)
+    with pytest.raises(gcp_exceptions.InvalidArgument):
+        _retry()(func)()
+    assert len(calls) == 1
+
+
+def test_publish_retry_spends_budget_only_on_retries_made():
+    budget = RetryBudget(ratio=0.1, burst=1)
+    func, calls = _flaky(failures=5)
+    with pytest.raises(gcp_exceptions.ServiceUnavailable):
+        _retry(budget)(func)()
+    assert len(calls) == 2
+    assert budget.retries == 1
+
+    # The deadline leaves no room for a retry, so the budget is not charged
+    budget = RetryBudget(ratio=0.1, burst=1)
+    func, calls = _flaky(failures=5)
+    with pytest.raises(gcp_exceptions.ServiceUnavailable):
+        _retry(budget, timeout=0)(func)()
+    assert len(calls) == 1
+    assert (budget.retries, budget.retries_denied) == (0, 0)
+
+
+def test_publish_retry_with_timeout_keeps_cap_and_budget():
+    budget = RetryBudget(ratio=0.1, burst=1)
+    retry = _retry(budget, max_attempts=2).with_timeout(5)
+    assert isinstance(retry, PublishRetry)
+    assert (retry.max_attempts, retry.budget) == (2, budget)